@@ -1,10 +1,18 @@
 """AI analyzers for Daily Market Digest."""
-from .news_analyzer import NewsAnalyzer
-from .video_analyzer import VideoAnalyzer
-from .stock_analyzer import StockAnalyzer
-from .industry_analyzer import IndustryAnalyzer, AnalysisResult
-from .pre_market_analyzer import PreMarketAnalyzer, LayeredReportResult
-from .pre_market_v3 import PreMarketV3Analyzer
+import importlib
+
+# Analyzer classes are imported on first attribute access (PEP 562), so
+# importing one analyzer does not load every other one and its SDK deps.
+_LAZY_IMPORTS = {
+    "NewsAnalyzer": ".news_analyzer",
+    "VideoAnalyzer": ".video_analyzer",
+    "StockAnalyzer": ".stock_analyzer",
+    "IndustryAnalyzer": ".industry_analyzer",
+    "AnalysisResult": ".industry_analyzer",
+    "PreMarketAnalyzer": ".pre_market_analyzer",
+    "LayeredReportResult": ".pre_market_analyzer",
+    "PreMarketV3Analyzer": ".pre_market_v3",
+}
 
 __all__ = [
     "NewsAnalyzer",
@@ -16,3 +24,17 @@ __all__ = [
     "LayeredReportResult",
     "PreMarketV3Analyzer",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,194 @@
+"""
+Gemini Client Module
+Process-wide access to a single google-genai client, plus request helpers
+that retry rate-limited calls and cap concurrent async requests.
+"""
+import asyncio
+import importlib.util
+import logging
+import random
+import threading
+import time
+import weakref
+from functools import lru_cache
+
+import httpx
+from google import genai
+from google.genai import errors, types
+
+from src.config.settings import (
+    GEMINI_API_KEY,
+    GEMINI_KEEPALIVE_CONNECTIONS,
+    GEMINI_MAX_PARALLEL,
+    GEMINI_MAX_RETRIES,
+    GEMINI_RETRY_MAX_WAIT,
+)
+
+logger = logging.getLogger(__name__)
+
+# 429 rate limit and transient server-side / gateway failures; other 4xx
+# (bad request, auth) are permanent
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# One semaphore per event loop (run_sync's loop, or a caller's own)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+# Event loop behind run_sync, created on first use and kept for the process
+_loop: asyncio.AbstractEventLoop = None
+_loop_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def get_client() -> genai.Client:
+    """
+    Return the shared Gemini client.
+
+    Every analyzer reuses the same client (and its underlying HTTP
+    connection pool) instead of opening a new one per instance. Idle
+    connections are kept alive between calls, and HTTP/2 is used when
+    the optional h2 package is installed.
+    """
+    transport_args = {
+        "limits": httpx.Limits(max_keepalive_connections=GEMINI_KEEPALIVE_CONNECTIONS),
+        "http2": importlib.util.find_spec("h2") is not None,
+    }
+    return genai.Client(
+        api_key=GEMINI_API_KEY,
+        http_options=types.HttpOptions(
+            client_args=transport_args,
+            async_client_args=transport_args,
+        ),
+    )
+
+
+def run_sync(coroutine, *more_coroutines):
+    """
+    Run a coroutine to completion on the process-wide event loop.
+
+    Sync entry points use this instead of asyncio.run(): the shared
+    client's async connection pool is bound to the loop that first used
+    it, so a second asyncio.run() loop would fail with "Event loop is
+    closed".
+
+    Given several independent coroutines, they are awaited together with
+    asyncio.gather on that loop and their results returned as a list.
+    """
+    global _loop
+    awaitable = coroutine
+    if more_coroutines:
+        async def gathered():
+            return await asyncio.gather(coroutine, *more_coroutines)
+        awaitable = gathered()
+    with _loop_lock:
+        if _loop is None or _loop.is_closed():
+            _loop = asyncio.new_event_loop()
+        return _loop.run_until_complete(awaitable)
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    return isinstance(error, httpx.TimeoutException)
+
+
+def _retry_reason(error: Exception) -> str:
+    return str(error.code) if isinstance(error, errors.APIError) else "timeout"
+
+
+def _backoff_seconds(attempt: int) -> float:
+    """Exponential backoff with jitter: ~1s, 2s, 4s, ... capped at GEMINI_RETRY_MAX_WAIT."""
+    return min(GEMINI_RETRY_MAX_WAIT, 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+def _request_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(GEMINI_MAX_PARALLEL)
+    return semaphore
+
+
+def generate_with_retry(client: genai.Client, **kwargs):
+    """
+    Call client.models.generate_content, retrying rate-limited,
+    unavailable or timed-out requests with exponential backoff.
+
+    Non-retryable errors, and the last retryable one, are raised as-is.
+    """
+    for attempt in range(GEMINI_MAX_RETRIES):
+        try:
+            return client.models.generate_content(**kwargs)
+        except Exception as e:
+            if not _is_retryable(e) or attempt == GEMINI_MAX_RETRIES - 1:
+                raise
+            wait = _backoff_seconds(attempt)
+            logger.warning(f"   ⏳ Gemini {_retry_reason(e)}, retrying in {wait:.1f}s...")
+            time.sleep(wait)
+
+
+def stream_with_retry(client: genai.Client, **kwargs):
+    """
+    Generator over client.models.generate_content_stream chunks.
+
+    Like stream_with_retry_async, a retryable error is only retried if no
+    chunk has been yielded yet.
+    """
+    for attempt in range(GEMINI_MAX_RETRIES):
+        received = False
+        try:
+            for chunk in client.models.generate_content_stream(**kwargs):
+                received = True
+                yield chunk
+            return
+        except Exception as e:
+            if received or not _is_retryable(e) or attempt == GEMINI_MAX_RETRIES - 1:
+                raise
+            wait = _backoff_seconds(attempt)
+            logger.warning(f"   ⏳ Gemini {_retry_reason(e)}, retrying in {wait:.1f}s...")
+            time.sleep(wait)
+
+
+async def generate_with_retry_async(client: genai.Client, **kwargs):
+    """
+    Async counterpart of generate_with_retry.
+
+    At most GEMINI_MAX_PARALLEL requests are in flight per event loop; a
+    request gives up its slot while it waits to retry.
+    """
+    for attempt in range(GEMINI_MAX_RETRIES):
+        try:
+            async with _request_slots():
+                return await client.aio.models.generate_content(**kwargs)
+        except Exception as e:
+            if not _is_retryable(e) or attempt == GEMINI_MAX_RETRIES - 1:
+                raise
+            wait = _backoff_seconds(attempt)
+            logger.warning(f"   ⏳ Gemini {_retry_reason(e)}, retrying in {wait:.1f}s...")
+            await asyncio.sleep(wait)
+
+
+async def stream_with_retry_async(client: genai.Client, **kwargs):
+    """
+    Async generator over client.aio.models.generate_content_stream chunks.
+
+    Shares the request slots of generate_with_retry_async. A retryable
+    error is only retried if no chunk has been yielded yet; a stream that
+    fails midway cannot be replayed and the error is raised.
+    """
+    for attempt in range(GEMINI_MAX_RETRIES):
+        received = False
+        try:
+            async with _request_slots():
+                stream = await client.aio.models.generate_content_stream(**kwargs)
+                async for chunk in stream:
+                    received = True
+                    yield chunk
+            return
+        except Exception as e:
+            if received or not _is_retryable(e) or attempt == GEMINI_MAX_RETRIES - 1:
+                raise
+            wait = _backoff_seconds(attempt)
+            logger.warning(f"   ⏳ Gemini {_retry_reason(e)}, retrying in {wait:.1f}s...")
+            await asyncio.sleep(wait)
@@ -10,22 +10,70 @@ Pipeline:
 5. Company Moves Analysis
 6. Final Report Generation
 """
-from google import genai
+import hashlib
+import io
+from collections import defaultdict
 from google.genai import types
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Optional
+from types import MappingProxyType
+from typing import Callable, Optional
 import json
+import logging
+import time
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.config.settings import (
     GEMINI_API_KEY,
     GEMINI_MODEL,
+    GEMINI_MAX_OUTPUT_TOKENS,
+    INDUSTRY_RAW_DATA_TOKEN_BUDGET,
+    ANALYSIS_CACHE_DIR,
+    ANALYSIS_CACHE_TTL_HOURS,
+)
+from src.analyzers.gemini_client import (
+    get_client,
+    generate_with_retry,
+    generate_with_retry_async,
+    run_sync,
+    stream_with_retry_async,
 )
-from src.collectors.base import IntelItem
+from src.analyzers.prompt_budget import truncate_to_tokens
+from src.collectors.base import IntelItem, normalize_title
+
+logger = logging.getLogger(__name__)
+
+
+def _sections_schema(keys: tuple) -> types.Schema:
+    """Structured-output schema: one required Markdown string per key."""
+    return types.Schema(
+        type=types.Type.OBJECT,
+        properties={key: types.Schema(type=types.Type.STRING) for key in keys},
+        required=list(keys),
+    )
+
+
+# Structured output for the fused steps 3-5 request
+ANALYSIS_STEPS = ("step3", "step4", "step5")
+ANALYSIS_RESPONSE_SCHEMA = _sections_schema(ANALYSIS_STEPS)
+
+# Structured output for the single-request pipeline: one Markdown string per step.
+COMBINED_STEPS = ("step2", "step3", "step4", "step5", "step6")
+COMBINED_RESPONSE_SCHEMA = _sections_schema(COMBINED_STEPS)
+
+# Section headings for _format_raw_data, keyed by SourceType value
+_TYPE_LABELS = MappingProxyType({
+    "news": "新聞報導",
+    "sec_filing": "SEC 財報/公告",
+    "research_paper": "研究論文",
+    "clinical_trial": "臨床試驗",
+    "regulatory": "監管公告",
+})
 
 
 @dataclass
@@ -50,6 +98,16 @@ class AnalysisResult:
     # Metadata
     processing_time: float = 0.0
     token_usage: dict = field(default_factory=dict)
+    failed_steps: list = field(default_factory=list)
+
+    def to_bytes(self) -> bytes:
+        """Serialize to compact UTF-8 JSON."""
+        return json.dumps(asdict(self), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "AnalysisResult":
+        """Rebuild a result written by to_bytes."""
+        return cls(**json.loads(data))
 
 
 class IndustryAnalyzer:
@@ -63,13 +121,16 @@ class IndustryAnalyzer:
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not set in environment")
 
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
+        self.client = get_client()
         self.model = GEMINI_MODEL
 
     def analyze(
         self,
         intel_items: list[IntelItem],
         run_full_pipeline: bool = True,
+        single_request: bool = False,
+        on_report_chunk: Optional[Callable[[str], None]] = None,
+        use_cache: bool = True,
     ) -> AnalysisResult:
         """
         Run the full analysis pipeline.
@@ -77,11 +138,72 @@ class IndustryAnalyzer:
         Args:
             intel_items: List of intelligence items
             run_full_pipeline: If False, only runs classification step
+            single_request: If True, run steps 2-6 as one structured Gemini
+                request instead of five chained calls
+            on_report_chunk: Optional callback receiving each streamed chunk
+                of the step 6 report as it is generated
+            use_cache: If True, reuse a full-pipeline result for the same
+                intel items from ANALYSIS_CACHE_DIR (e.g. after a crash later
+                in the report run). Only results with no failed steps are
+                cached, and only for ANALYSIS_CACHE_TTL_HOURS.
 
         Returns:
             AnalysisResult with all analysis outputs
         """
-        import time
+        cache_path = None
+        if use_cache and run_full_pipeline:
+            cache_path = self._cache_path(intel_items, single_request)
+            result = self._load_cached(cache_path)
+            if result is not None:
+                logger.info(f"♻️ Loaded cached analysis: {cache_path.name}")
+                if on_report_chunk and result.final_report:
+                    on_report_chunk(result.final_report)
+                return result
+
+        result = run_sync(
+            self._analyze_async(
+                intel_items, run_full_pipeline, single_request, on_report_chunk
+            )
+        )
+
+        if cache_path and result.final_report and not result.failed_steps:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            cache_path.write_bytes(result.to_bytes())
+
+        return result
+
+    def _cache_path(self, intel_items: list[IntelItem], single_request: bool) -> Path:
+        """Cache file keyed by the model, pipeline mode and the intel items' identities."""
+        digest = hashlib.sha256(f"{self.model}|{single_request}".encode("utf-8"))
+        for item in intel_items:
+            digest.update(f"\n{item.url}|{item.title}".encode("utf-8"))
+        return ANALYSIS_CACHE_DIR / f"{digest.hexdigest()[:32]}.json"
+
+    def _load_cached(self, cache_path: Path) -> Optional[AnalysisResult]:
+        """Return the cached result if present and younger than the TTL; None otherwise."""
+        try:
+            if time.time() - cache_path.stat().st_mtime > ANALYSIS_CACHE_TTL_HOURS * 3600:
+                return None
+            return AnalysisResult.from_bytes(cache_path.read_bytes())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"⚠️ Ignoring unreadable analysis cache {cache_path.name}: {e}")
+            return None
+
+    async def _analyze_async(
+        self,
+        intel_items: list[IntelItem],
+        run_full_pipeline: bool = True,
+        single_request: bool = False,
+        on_report_chunk: Optional[Callable[[str], None]] = None,
+    ) -> AnalysisResult:
+        """
+        Async implementation of the pipeline.
+
+        Steps 3-5 only depend on step 2, so they are sent as one
+        structured-output request; step 6 waits for it.
+        """
         start_time = time.time()
 
         result = AnalysisResult()
@@ -89,95 +211,114 @@ class IndustryAnalyzer:
         # Format raw data
         raw_data = self._format_raw_data(intel_items)
 
+        if run_full_pipeline and single_request:
+            logger.info("🧩 Steps 2-6: Running combined single-request analysis...")
+            sections, ok = await self._combined_analysis(raw_data)
+            if not ok:
+                result.failed_steps.append("steps2-6")
+            result.classified_data = {"raw_response": sections["step2"]}
+            result.paradigm_shifts = [{"raw_response": sections["step3"]}]
+            result.tech_analysis = sections["step4"]
+            result.company_analysis = sections["step5"]
+            result.final_report = sections["step6"]
+
+            result.processing_time = time.time() - start_time
+            logger.info(f"✅ Analysis complete in {result.processing_time:.1f}s")
+            return result
+
         # Step 2: Classify and identify high-signal events
-        print("🔍 Step 2: Classifying data and identifying high-signal events...")
-        classification = self._step2_classify_data(raw_data)
+        logger.info("🔍 Step 2: Classifying data and identifying high-signal events...")
+        classification = await self._step2_classify_data(raw_data)
+        if "error" in classification:
+            result.failed_steps.append("step2")
         result.classified_data = classification.get("classified", {})
         result.high_signal_events = classification.get("high_signal_events", [])
 
         if not run_full_pipeline:
             return result
 
-        # Step 3: Analyze paradigm shifts
-        print("🔄 Step 3: Analyzing paradigm shifts...")
-        result.paradigm_shifts = self._step3_paradigm_shifts(
-            result.high_signal_events
-        )
+        # Steps 4-5 share one token-budgeted excerpt of the raw data
+        raw_excerpt = truncate_to_tokens(raw_data, INDUSTRY_RAW_DATA_TOKEN_BUDGET)
 
-        # Step 4: Analyze technology progress
-        print("💻 Step 4: Analyzing technology frontier...")
-        result.tech_analysis = self._step4_technology_analysis(
-            raw_data, result.high_signal_events
-        )
-
-        # Step 5: Analyze company moves
-        print("🏢 Step 5: Analyzing company moves...")
-        result.company_analysis = self._step5_company_analysis(
-            raw_data, result.high_signal_events
-        )
+        # Steps 3-5: paradigm shifts, technology, company moves (one request)
+        logger.info("🔄 Steps 3-5: Analyzing paradigm shifts, technology frontier and company moves...")
+        (
+            result.paradigm_shifts,
+            result.tech_analysis,
+            result.company_analysis,
+            ok,
+        ) = await self._steps345_analysis(raw_excerpt, result.high_signal_events)
+        if not ok:
+            result.failed_steps.append("steps3-5")
 
         # Step 6: Generate final report
-        print("📝 Step 6: Generating final report...")
-        result.final_report = self._step6_final_report(
+        logger.info("📝 Step 6: Generating final report...")
+        result.final_report, ok = await self._step6_final_report(
             result.high_signal_events,
             result.paradigm_shifts,
             result.tech_analysis,
             result.company_analysis,
+            on_chunk=on_report_chunk,
         )
+        if not ok:
+            result.failed_steps.append("step6")
 
         result.processing_time = time.time() - start_time
-        print(f"✅ Analysis complete in {result.processing_time:.1f}s")
+        logger.info(f"✅ Analysis complete in {result.processing_time:.1f}s")
 
         return result
 
+    def _dedupe(self, intel_items: list[IntelItem]) -> list[IntelItem]:
+        """
+        Drop repeated headlines (e.g. wire copies via multiple outlets).
+
+        source_type is part of the key so a news article and the SEC
+        filing it reports on are both kept.
+        """
+        seen = set()
+        unique_items = []
+        for item in intel_items:
+            key = (item.source_type, normalize_title(item.title))
+            if key not in seen:
+                seen.add(key)
+                unique_items.append(item)
+        return unique_items
+
     def _format_raw_data(self, intel_items: list[IntelItem]) -> str:
         """Format raw intelligence data for prompts."""
-        lines = []
-
         # Group by source type
-        by_type = {}
-        for item in intel_items:
-            st = item.source_type.value
-            if st not in by_type:
-                by_type[st] = []
-            by_type[st].append(item)
-
-        type_labels = {
-            "news": "新聞報導",
-            "sec_filing": "SEC 財報/公告",
-            "research_paper": "研究論文",
-            "clinical_trial": "臨床試驗",
-            "regulatory": "監管公告",
-        }
+        by_type = defaultdict(list)
+        for item in self._dedupe(intel_items):
+            by_type[item.source_type.value].append(item)
+
+        # Every line is written with a trailing newline; the last one is
+        # dropped on return to match the previous "\n".join output.
+        buf = io.StringIO()
+        write = buf.write
 
         for source_type, items in by_type.items():
-            label = type_labels.get(source_type, source_type)
-            lines.append(f"\n### {label}\n")
+            label = _TYPE_LABELS.get(source_type, source_type)
+            write(f"\n### {label}\n\n")
 
             for item in items[:50]:  # Limit per type
-                date_str = item.published.strftime("%m/%d")
-                entities = ", ".join(item.related_entities[:3]) if item.related_entities else ""
-                tickers = ", ".join([f"${t}" for t in item.related_tickers[:3]]) if item.related_tickers else ""
-                tags = f" [{entities}]" if entities else (f" [{tickers}]" if tickers else "")
+                entities = ", ".join(item.related_entities[:3])
+                tag = entities or item.ticker_prefix_str
+                tags = f" [{tag}]" if tag else ""
 
-                lines.append(f"- [{date_str}] [{item.source}] {item.title}{tags}")
-                if item.summary:
-                    summary = item.summary[:200] + "..." if len(item.summary) > 200 else item.summary
-                    lines.append(f"  {summary}")
+                write(f"- [{item.display_date}] [{item.source}] {item.title}{tags}\n")
+                summary = item.summary
+                if summary:
+                    write("  ")
+                    write(summary[:200])
+                    if len(summary) > 200:
+                        write("...")
+                    write("\n")
 
-        return "\n".join(lines)
+        return buf.getvalue()[:-1]
 
-    def _step2_classify_data(self, raw_data: str) -> dict:
-        """
-        Step 2: Classify data and identify high-signal events.
-
-        Categories:
-        a) 直接事實 (observable facts)
-        b) 行為訊號 (actions / decisions)
-        c) 約束或激勵線索 (constraints / incentives)
-        d) 噪音或重複資訊
-        """
-        prompt = f"""你是一位世界級全產業、商業與科技研究合夥人。
+    def _step2_prompt(self, raw_data: str) -> str:
+        """Build the step 2 (classification) prompt."""
+        return f"""你是一位世界級全產業、商業與科技研究合夥人。
 
 **【本步驟限制】**
 - 不允許進行任何第一性原則、宏觀解釋或高階推論
@@ -226,8 +367,23 @@ d) **噪音或重複資訊**
 
 請以結構化格式（JSON-like）回答，方便後續處理。使用繁體中文。"""
 
+    async def _step2_classify_data(self, raw_data: str) -> dict:
+        """
+        Step 2: Classify data and identify high-signal events.
+
+        On failure the returned dict carries an "error" key.
+
+        Categories:
+        a) 直接事實 (observable facts)
+        b) 行為訊號 (actions / decisions)
+        c) 約束或激勵線索 (constraints / incentives)
+        d) 噪音或重複資訊
+        """
+        prompt = self._step2_prompt(raw_data)
+
         try:
-            response = self.client.models.generate_content(
+            response = await generate_with_retry_async(
+                self.client,
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -239,14 +395,9 @@ d) **噪音或重複資訊**
         except Exception as e:
             return {"error": str(e), "high_signal_events": [], "classified": {}}
 
-    def _step3_paradigm_shifts(self, high_signal_events: list) -> list:
-        """
-        Step 3: Analyze paradigm shifts from high-signal events.
-        """
-        # Use the raw response from step 2 which contains high signal events
-        events_text = high_signal_events if isinstance(high_signal_events, str) else str(high_signal_events)
-
-        prompt = f"""基於以下高信號事件的分析：
+    def _step3_prompt(self, events_text: str) -> str:
+        """Build the step 3 (paradigm shift) prompt."""
+        return f"""基於以下高信號事件的分析：
 
 {events_text}
 
@@ -295,24 +446,9 @@ d) **噪音或重複資訊**
 
 請使用繁體中文，以顧問語言撰寫。明確區分【事實】【推論】【假說】。"""
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=3000,
-                ),
-            )
-            return [{"raw_response": response.text}]
-        except Exception as e:
-            return [{"error": str(e)}]
-
-    def _step4_technology_analysis(self, raw_data: str, high_signal_events) -> str:
-        """
-        Step 4: Analyze technology progress with workflow focus.
-        """
-        prompt = f"""你是一位世界級科技研究合夥人。
+    def _step4_prompt(self, raw_data: str) -> str:
+        """Build the step 4 (technology) prompt."""
+        return f"""你是一位世界級科技研究合夥人。
 
 **【本步驟的第一性原則要求】**
 
@@ -330,7 +466,7 @@ d) **噪音或重複資訊**
 
 基於以下資料，分析本週的技術進展：
 
-{raw_data[:8000]}
+{raw_data}
 
 ---
 
@@ -367,24 +503,9 @@ d) **噪音或重複資訊**
 請聚焦在對工作方式有實質影響的技術，忽略純學術或遠期的進展。
 使用繁體中文，顧問語言。"""
 
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=4000,
-                ),
-            )
-            return response.text
-        except Exception as e:
-            return f"技術分析生成錯誤: {e}"
-
-    def _step5_company_analysis(self, raw_data: str, high_signal_events) -> str:
-        """
-        Step 5: Analyze company moves and strategic implications.
-        """
-        prompt = f"""你是一位世界級企業策略研究合夥人。
+    def _step5_prompt(self, raw_data: str) -> str:
+        """Build the step 5 (company moves) prompt."""
+        return f"""你是一位世界級企業策略研究合夥人。
 
 **【本步驟的必要輸出】**
 
@@ -401,7 +522,7 @@ d) **噪音或重複資訊**
 
 基於以下資料，分析本週重要公司的動態：
 
-{raw_data[:8000]}
+{raw_data}
 
 ---
 
@@ -438,34 +559,79 @@ d) **噪音或重複資訊**
 只分析有重大動作的公司（3-5 家），不要列出所有提及的公司。
 使用繁體中文，顧問語言。明確區分【事實】【推論】【假說】。"""
 
+    def _steps345_prompt(self, events_text: str, raw_data: str) -> str:
+        """Build one prompt carrying the step 3-5 prompts, with raw_data sent once."""
+        raw_ref = "（見上方【原始資料】）"
+        keys = ", ".join(ANALYSIS_STEPS)
+
+        return f"""請在單一回覆中分別完成以下 <step3> 到 <step5> 三個獨立的分析任務。
+
+輸出格式：JSON 物件，鍵為 {keys}，值為該任務的完整 Markdown 文字。
+
+---
+
+【原始資料】
+
+{raw_data}
+
+---
+
+<step3>
+{self._step3_prompt(events_text)}
+</step3>
+
+<step4>
+{self._step4_prompt(raw_ref)}
+</step4>
+
+<step5>
+{self._step5_prompt(raw_ref)}
+</step5>"""
+
+    async def _steps345_analysis(self, raw_data: str, high_signal_events) -> tuple[list, str, str, bool]:
+        """
+        Steps 3-5: paradigm shifts, technology progress and company moves.
+
+        Returns:
+            (paradigm_shifts, tech_analysis, company_analysis, ok), where ok
+            is False if the request failed and the texts are error messages
+        """
+        # Use the raw response from step 2 which contains high signal events
+        events_text = high_signal_events if isinstance(high_signal_events, str) else str(high_signal_events)
+
+        prompt = self._steps345_prompt(events_text, raw_data)
+
         try:
-            response = self.client.models.generate_content(
+            response = await generate_with_retry_async(
+                self.client,
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
                     temperature=0.3,
-                    max_output_tokens=4000,
+                    max_output_tokens=GEMINI_MAX_OUTPUT_TOKENS,
+                    response_mime_type="application/json",
+                    response_schema=ANALYSIS_RESPONSE_SCHEMA,
                 ),
             )
-            return response.text
+            parsed = json.loads(response.text)
+            return (
+                [{"raw_response": str(parsed.get("step3", ""))}],
+                str(parsed.get("step4", "")),
+                str(parsed.get("step5", "")),
+                True,
+            )
         except Exception as e:
-            return f"公司分析生成錯誤: {e}"
+            return [{"error": str(e)}], f"技術分析生成錯誤: {e}", f"公司分析生成錯誤: {e}", False
 
-    def _step6_final_report(
+    def _step6_prompt(
         self,
-        high_signal_events,
-        paradigm_shifts: list,
+        events_text: str,
+        shifts_text: str,
         tech_analysis: str,
         company_analysis: str,
     ) -> str:
-        """
-        Step 6: Generate the final weekly industry cognition report.
-        """
-        # Compile previous analyses
-        events_text = high_signal_events.get("raw_response", "") if isinstance(high_signal_events, dict) else str(high_signal_events)
-        shifts_text = paradigm_shifts[0].get("raw_response", "") if paradigm_shifts else ""
-
-        prompt = f"""你是一位世界級全產業、商業與科技研究合夥人。
+        """Build the step 6 (final report) prompt."""
+        return f"""你是一位世界級全產業、商業與科技研究合夥人。
 你的讀者是頂尖的全球管理顧問與投資顧問：
 - 他們學習速度極快
 - 但不預設熟悉任何單一產業
@@ -544,18 +710,123 @@ d) **噪音或重複資訊**
 - 假設讀者時間極其有限
 - 使用繁體中文"""
 
+    async def _step6_final_report(
+        self,
+        high_signal_events,
+        paradigm_shifts: list,
+        tech_analysis: str,
+        company_analysis: str,
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> tuple[str, bool]:
+        """
+        Step 6: Generate the final weekly industry cognition report.
+
+        The report is streamed so on_chunk can render it while the rest
+        is still being generated.
+
+        Returns:
+            (report, ok), where ok is False if generation failed and the
+            report is an error message
+        """
+        # Compile previous analyses
+        events_text = high_signal_events.get("raw_response", "") if isinstance(high_signal_events, dict) else str(high_signal_events)
+        shifts_text = paradigm_shifts[0].get("raw_response", "") if paradigm_shifts else ""
+
+        prompt = self._step6_prompt(events_text, shifts_text, tech_analysis, company_analysis)
+
+        buf = io.StringIO()
         try:
-            response = self.client.models.generate_content(
+            async for chunk in stream_with_retry_async(
+                self.client,
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
                     temperature=0.4,
                     max_output_tokens=8000,
                 ),
+            ):
+                text = chunk.text or ""
+                buf.write(text)
+                if on_chunk and text:
+                    on_chunk(text)
+            return buf.getvalue(), True
+        except Exception as e:
+            return f"報告生成錯誤: {e}", False
+
+    def _combined_prompt(self, raw_data: str) -> str:
+        """Build one prompt that carries the step 2-6 prompts as labeled sections."""
+        raw_ref = "（見上方【原始資料】）"
+        step6 = self._step6_prompt(
+            "（見 <step2> 輸出）",
+            "（見 <step3> 輸出）",
+            "（見 <step4> 輸出）",
+            "（見 <step5> 輸出）",
+        )
+        keys = ", ".join(COMBINED_STEPS)
+
+        return f"""你是一位世界級全產業、商業與科技研究合夥人。
+
+請在單一回覆中依序完成以下 <step2> 到 <step6> 五個步驟。
+後面的步驟必須直接使用你在前面步驟中的輸出（例如 <step3> 使用 <step2> 選出的高信號事件，<step6> 整合 <step2>-<step5>）。
+
+輸出格式：JSON 物件，鍵為 {keys}，值為該步驟的完整 Markdown 文字。
+
+---
+
+【原始資料】
+
+{raw_data}
+
+---
+
+<step2>
+{self._step2_prompt(raw_ref)}
+</step2>
+
+<step3>
+{self._step3_prompt("（見 <step2> 輸出的高信號事件）")}
+</step3>
+
+<step4>
+{self._step4_prompt(raw_ref)}
+</step4>
+
+<step5>
+{self._step5_prompt(raw_ref)}
+</step5>
+
+<step6>
+{step6}
+</step6>"""
+
+    async def _combined_analysis(self, raw_data: str) -> tuple[dict, bool]:
+        """
+        Run steps 2-6 as a single structured-output request.
+
+        Returns:
+            (sections, ok): a dict mapping each key in COMBINED_STEPS to its
+            Markdown output, and False if the request failed
+        """
+        prompt = self._combined_prompt(raw_data)
+
+        try:
+            response = await generate_with_retry_async(
+                self.client,
+                model=self.model,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    temperature=0.3,
+                    max_output_tokens=GEMINI_MAX_OUTPUT_TOKENS,
+                    response_mime_type="application/json",
+                    response_schema=COMBINED_RESPONSE_SCHEMA,
+                ),
             )
-            return response.text
+            parsed = json.loads(response.text)
+            return {key: str(parsed.get(key, "")) for key in COMBINED_STEPS}, True
         except Exception as e:
-            return f"報告生成錯誤: {e}"
+            sections = {key: "" for key in COMBINED_STEPS}
+            sections["step6"] = f"報告生成錯誤: {e}"
+            return sections, False
 
     def quick_analysis(self, intel_items: list[IntelItem]) -> str:
         """
@@ -593,7 +864,8 @@ d) **噪音或重複資訊**
 使用繁體中文，顧問語言，800-1000 字。"""
 
         try:
-            response = self.client.models.generate_content(
+            response = generate_with_retry(
+                self.client,
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -609,6 +881,9 @@ d) **噪音或重複資訊**
 def main():
     """Test the industry analyzer."""
     from src.collectors.intel_aggregator import IntelAggregator
+    from src.config.log_setup import setup_logging
+
+    setup_logging()
 
     print("\n" + "="*60)
     print("Testing Industry Analyzer")
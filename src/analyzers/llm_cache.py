@@ -0,0 +1,180 @@
+"""
+LLM Response Cache Module
+Reuses Gemini responses across runs so repeated or near-identical prompts
+do not trigger a new billed request.
+
+SemanticCache: embeds a short key text (e.g. the news titles fed into a
+prompt) and returns a stored response when a cached embedding is within a
+cosine-similarity threshold and younger than the TTL. Disabled (no
+embedding request, always a miss) when ENABLE_GEMINI_CACHE is off.
+
+ResponseCache: exact-match cache keyed by a hash of the full request
+(model, prompt, generation settings), e.g. reruns on the same inputs.
+Disabled (always a miss, never stored) when ENABLE_GEMINI_CACHE is off.
+Safe to share between threads.
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from src.config.settings import (
+    LLM_CACHE_PATH,
+    GEMINI_EMBEDDING_MODEL,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL_HOURS,
+    RESPONSE_CACHE_TTL_HOURS,
+    ENABLE_GEMINI_CACHE,
+)
+
+
+class SemanticCache:
+    """Embedding-keyed response cache backed by SQLite."""
+
+    def __init__(
+        self,
+        client,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl_hours: float = SEMANTIC_CACHE_TTL_HOURS,
+        db_path: Path = LLM_CACHE_PATH,
+        enabled: bool = ENABLE_GEMINI_CACHE,
+    ):
+        self.client = client
+        self.enabled = enabled
+        self.threshold = threshold
+        self.ttl_seconds = ttl_hours * 3600
+        self._conn = sqlite3.connect(str(db_path))
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS semantic_cache (
+                namespace TEXT NOT NULL,
+                created REAL NOT NULL,
+                embedding BLOB NOT NULL,
+                response TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_semantic_ns ON semantic_cache (namespace, created)"
+        )
+        self._conn.commit()
+
+    def embed(self, text: str) -> Optional[np.ndarray]:
+        """Return the L2-normalized embedding of text, or None on failure or when disabled."""
+        if not self.enabled:
+            return None
+
+        try:
+            result = self.client.models.embed_content(
+                model=GEMINI_EMBEDDING_MODEL,
+                contents=text,
+            )
+            vector = np.asarray(result.embeddings[0].values, dtype=np.float32)
+        except Exception as e:
+            print(f"   ⚠️ Embedding failed, skipping cache: {e}")
+            return None
+
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return None
+        return vector / norm
+
+    def lookup(
+        self,
+        namespace: str,
+        embedding: Optional[np.ndarray],
+        threshold: Optional[float] = None,
+    ) -> Optional[str]:
+        """
+        Return the cached response most similar to embedding, if its cosine
+        similarity reaches threshold (default: the cache's threshold).
+        """
+        if embedding is None:
+            return None
+
+        rows = self._conn.execute(
+            "SELECT embedding, response FROM semantic_cache WHERE namespace = ? AND created >= ?",
+            (namespace, time.time() - self.ttl_seconds),
+        ).fetchall()
+        rows = [row for row in rows if len(row[0]) == embedding.nbytes]
+        if not rows:
+            return None
+
+        matrix = np.frombuffer(b"".join(row[0] for row in rows), dtype=np.float32)
+        similarities = matrix.reshape(len(rows), -1) @ embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] >= (self.threshold if threshold is None else threshold):
+            return rows[best][1]
+        return None
+
+    def store(self, namespace: str, embedding: Optional[np.ndarray], response: str) -> None:
+        """Store a response under its key embedding, dropping the namespace's expired rows."""
+        if embedding is None or not response:
+            return
+
+        now = time.time()
+        self._conn.execute(
+            "DELETE FROM semantic_cache WHERE namespace = ? AND created < ?",
+            (namespace, now - self.ttl_seconds),
+        )
+        self._conn.execute(
+            "INSERT INTO semantic_cache (namespace, created, embedding, response) VALUES (?, ?, ?, ?)",
+            (namespace, now, embedding.astype(np.float32).tobytes(), response),
+        )
+        self._conn.commit()
+
+
+class ResponseCache:
+    """Request-hash-keyed response cache backed by SQLite."""
+
+    def __init__(
+        self,
+        ttl_hours: float = RESPONSE_CACHE_TTL_HOURS,
+        db_path: Path = LLM_CACHE_PATH,
+        enabled: bool = ENABLE_GEMINI_CACHE,
+    ):
+        self.ttl_seconds = ttl_hours * 3600
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                created REAL NOT NULL,
+                response TEXT NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """Hash the request fields (model, prompt, temperature, ...) into a cache key."""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key if younger than the TTL."""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM response_cache WHERE key = ? AND created >= ?",
+                (key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        return row[0] if row else None
+
+    def put(self, key: str, response: str) -> None:
+        """Store (or refresh) the response for key."""
+        if not self.enabled or not response:
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, created, response) VALUES (?, ?, ?)",
+                (key, time.time(), response),
+            )
+            self._conn.commit()
@@ -2,21 +2,41 @@
 News Analyzer Module
 Uses Gemini AI to analyze and summarize financial news with stock-specific insights.
 """
-from google import genai
+import io
+import re
+from collections import Counter, defaultdict
 from google.genai import types
 from typing import Optional
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.config.settings import (
     GEMINI_API_KEY,
     GEMINI_MODEL,
     GEMINI_TEMPERATURE,
     GEMINI_MAX_OUTPUT_TOKENS,
+    SEMANTIC_CACHE_BATCH_THRESHOLD,
 )
+from src.analyzers.gemini_client import get_client, generate_with_retry
+from src.collectors.base import normalize_title
 from src.collectors.news import NewsItem
+from src.analyzers.llm_cache import SemanticCache
+
+
+# Sentiment keywords, matched in a single regex pass over the analysis text
+SENTIMENT_KEYWORDS = {
+    "bullish": ["看漲", "bullish", "樂觀", "利多", "正面", "上漲"],
+    "bearish": ["看跌", "bearish", "悲觀", "利空", "負面", "下跌"],
+    "neutral": ["震盪", "中性", "觀望", "持平"],
+}
+_KEYWORD_BUCKET = {
+    kw: bucket for bucket, keywords in SENTIMENT_KEYWORDS.items() for kw in keywords
+}
+_SENTIMENT_RE = re.compile("|".join(map(re.escape, _KEYWORD_BUCKET)))
 
 
 class NewsAnalyzer:
@@ -26,12 +46,13 @@ class NewsAnalyzer:
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not set in environment")
 
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
+        self.client = get_client()
         self.model = GEMINI_MODEL
         self.generation_config = types.GenerateContentConfig(
             temperature=GEMINI_TEMPERATURE,
             max_output_tokens=GEMINI_MAX_OUTPUT_TOKENS,
         )
+        self.cache = SemanticCache(self.client)
 
     def analyze_news_batch(self, news_items: list[NewsItem]) -> dict:
         """Analyze a batch of news items and generate market insights."""
@@ -39,17 +60,18 @@ class NewsAnalyzer:
             return {"summary": "No news items to analyze.", "sentiment": "neutral"}
 
         # Group news by source for better analysis
-        by_source = {}
+        by_source = defaultdict(list)
         for item in news_items:
-            if item.source not in by_source:
-                by_source[item.source] = []
             by_source[item.source].append(item)
 
+        # Wire copies syndicated across outlets add prompt tokens but no signal
+        prompt_items = self._dedupe(news_items)
+
         # Format news for analysis
-        news_text = self._format_news_for_analysis(news_items)
+        news_text = self._format_news_for_analysis(prompt_items)
 
         # Get news with related tickers
-        ticker_news = [n for n in news_items if n.related_tickers]
+        ticker_news = [n for n in prompt_items if n.related_tickers]
         ticker_section = self._format_ticker_news(ticker_news)
 
         prompt = f"""你是我的私人財經研究助理，請針對以下新聞提供直接、可操作的深度分析。
@@ -182,12 +204,23 @@ class NewsAnalyzer:
 """
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=self.generation_config,
-            )
-            analysis_text = response.text
+            # Reruns on an essentially unchanged batch reuse the cached analysis.
+            # The key covers every prompted item (source, title, tickers), and
+            # the stricter batch threshold makes a few new headlines a miss
+            cache_key = self.cache.embed("\n".join(
+                f"[{item.source}] {item.title} {' '.join(item.related_tickers or [])}"
+                for item in prompt_items
+            ))
+            analysis_text = self.cache.lookup("news_batch", cache_key, SEMANTIC_CACHE_BATCH_THRESHOLD)
+            if analysis_text is None:
+                response = generate_with_retry(
+                    self.client,
+                    model=self.model,
+                    contents=prompt,
+                    config=self.generation_config,
+                )
+                analysis_text = response.text
+                self.cache.store("news_batch", cache_key, analysis_text)
             sentiment = self._extract_sentiment(analysis_text)
 
             return {
@@ -206,23 +239,34 @@ class NewsAnalyzer:
                 "news_count": len(news_items),
             }
 
+    def _dedupe(self, news_items: list[NewsItem]) -> list[NewsItem]:
+        """Drop news items whose normalized title was already seen."""
+        seen = set()
+        unique_items = []
+        for item in news_items:
+            key = normalize_title(item.title)
+            if key not in seen:
+                seen.add(key)
+                unique_items.append(item)
+        return unique_items
+
     def _format_news_for_analysis(self, news_items: list[NewsItem]) -> str:
         """Format news items grouped by source."""
-        by_source = {}
+        by_source = defaultdict(list)
         for item in news_items:
-            if item.source not in by_source:
-                by_source[item.source] = []
             by_source[item.source].append(item)
 
-        formatted = []
+        buf = io.StringIO()
+        write = buf.write
         for source, items in by_source.items():
-            formatted.append(f"**{source}**")
+            write(f"**{source}**\n")
             for item in items[:8]:  # Limit per source
                 tickers = f" [{', '.join(item.related_tickers)}]" if item.related_tickers else ""
-                formatted.append(f"- {item.title}{tickers}")
-            formatted.append("")
+                write(f"- {item.title}{tickers}\n")
+            write("\n")
 
-        return "\n".join(formatted)
+        # Drop the final newline to match the previous "\n".join output
+        return buf.getvalue()[:-1]
 
     def _format_ticker_news(self, news_items: list[NewsItem]) -> str:
         """Format news items that mention specific tickers."""
@@ -230,11 +274,9 @@ class NewsAnalyzer:
             return "無相關新聞"
 
         # Group by ticker
-        by_ticker = {}
+        by_ticker = defaultdict(list)
         for item in news_items:
             for ticker in item.related_tickers:
-                if ticker not in by_ticker:
-                    by_ticker[ticker] = []
                 by_ticker[ticker].append(item)
 
         formatted = []
@@ -248,23 +290,22 @@ class NewsAnalyzer:
 
     def _get_ticker_mentions(self, news_items: list[NewsItem]) -> dict:
         """Count ticker mentions in news."""
-        mentions = {}
-        for item in news_items:
-            for ticker in item.related_tickers:
-                mentions[ticker] = mentions.get(ticker, 0) + 1
-        return dict(sorted(mentions.items(), key=lambda x: -x[1]))
+        mentions = Counter(
+            ticker for item in news_items for ticker in item.related_tickers
+        )
+        return dict(mentions.most_common())
 
     def _extract_sentiment(self, analysis_text: str) -> str:
         """Extract overall sentiment from analysis text."""
-        text_lower = analysis_text.lower()
+        # Each distinct keyword counts once toward its bucket
+        found = set(_SENTIMENT_RE.findall(analysis_text.lower()))
+        counts = {"bullish": 0, "bearish": 0, "neutral": 0}
+        for kw in found:
+            counts[_KEYWORD_BUCKET[kw]] += 1
 
-        bullish_keywords = ["看漲", "bullish", "樂觀", "利多", "正面", "上漲"]
-        bearish_keywords = ["看跌", "bearish", "悲觀", "利空", "負面", "下跌"]
-        neutral_keywords = ["震盪", "中性", "觀望", "持平"]
-
-        bullish_count = sum(1 for kw in bullish_keywords if kw in text_lower)
-        bearish_count = sum(1 for kw in bearish_keywords if kw in text_lower)
-        neutral_count = sum(1 for kw in neutral_keywords if kw in text_lower)
+        bullish_count = counts["bullish"]
+        bearish_count = counts["bearish"]
+        neutral_count = counts["neutral"]
 
         if bullish_count > bearish_count and bullish_count > neutral_count:
             return "bullish"
@@ -300,8 +341,17 @@ class NewsAnalyzer:
 短期（1-2週）和中期（1-3月）的看法
 """
 
+        namespace = f"stock_news:{ticker}"
+
         try:
-            response = self.client.models.generate_content(
+            # Keyed on the prompt's news text (titles and summaries)
+            cache_key = self.cache.embed(news_text)
+            cached = self.cache.lookup(namespace, cache_key)
+            if cached is not None:
+                return cached
+
+            response = generate_with_retry(
+                self.client,
                 model=self.model,
                 contents=prompt,
                 config=types.GenerateContentConfig(
@@ -309,6 +359,7 @@ class NewsAnalyzer:
                     max_output_tokens=800,
                 ),
             )
+            self.cache.store(namespace, cache_key, response.text)
             return response.text
         except Exception as e:
             return f"分析時發生錯誤: {e}"
@@ -329,11 +380,9 @@ def main():
         print(f"Collected {len(news)} news items")
 
         # Show source distribution
-        by_source = {}
-        for item in news:
-            by_source[item.source] = by_source.get(item.source, 0) + 1
+        by_source = Counter(item.source for item in news)
         print("\nBy source:")
-        for source, count in sorted(by_source.items(), key=lambda x: -x[1]):
+        for source, count in by_source.most_common():
             print(f"  {source}: {count}")
 
         # Analyze
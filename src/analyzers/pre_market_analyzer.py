@@ -10,32 +10,87 @@ Implements the 6-layer pre-market report structure:
 - Layer 4: Equity Signals
 - Layer 5: Decision Log
 """
+import asyncio
 import json
 import re
 from dataclasses import dataclass
 from typing import Optional
 
-from google import genai
-from google.genai import types
-
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from src.config.settings import (
     GEMINI_API_KEY,
     GEMINI_MODEL,
+    PRE_MARKET_HIDDEN_NEWS_TOKENS,
+    PRE_MARKET_LAYER_NEWS_TOKENS,
+    PRE_MARKET_SUMMARY_NEWS_TOKENS,
 )
+from src.analyzers.prompt_budget import truncate_to_tokens
+from src.prompts import build_prompt
 from src.prompts.pre_market import (
     HIDDEN_LAYER_PROMPT,
+    HIDDEN_LAYER_INPUT,
     LAYER_0_1_PROMPT,
-    LAYER_2_3_PROMPT,
-    LAYER_4_5_PROMPT,
+    LAYER_0_1_INPUT,
+    LAYER_2_5_PROMPT,
+    LAYER_2_5_INPUT,
     NEWS_SUMMARY_PROMPT,
+    NEWS_SUMMARY_INPUT,
 )
 
 
-@dataclass
+# Response parsing helpers, built once
+_JSON_DECODER = json.JSONDecoder()
+_LAYER_HEADER_RE = re.compile(r'### Layer (\d)')
+_UPPER_TOKEN_RE = re.compile(r'\b[A-Z]{1,5}\b')  # Plain ticker-shaped words
+_SECTION_4B_RE = re.compile(r'4B[:\s]*新發現.*?(?=###|$)', re.DOTALL | re.IGNORECASE)
+# Ticker mentions in the 4B section: $TICKER, (TICKER), **TICKER**, 【TICKER】
+# Each pattern is paired with a literal it cannot match without
+_TICKER_RES = [
+    ("$", re.compile(r'\$([A-Z]{1,5})\b')),
+    ("(", re.compile(r'\(([A-Z]{1,5})\)')),
+    ("**", re.compile(r'\*\*([A-Z]{1,5})\*\*')),
+    ("【", re.compile(r'【([A-Z]{1,5})】')),
+]
+
+
+# Structured output: one Markdown string per layer, headers included
+LAYER_0_1_KEYS = ("layer_0", "layer_1")
+LAYER_2_5_KEYS = ("layer_2", "layer_3", "layer_4", "layer_5")
+
+
+def _parse_layers(text: str, keys: tuple) -> tuple:
+    """Layer strings in key order from a structured-output response; raises if any is missing."""
+    layers = json.loads(text)
+    return tuple(layers[key] for key in keys)
+
+
+def _parse_hidden_layer(text: str) -> dict:
+    """
+    First JSON object in the hidden layer response; raw_decode stops at its
+    closing brace, so no greedy scan for the last "}" is needed.
+    """
+    start = text.find("{")
+    if start >= 0:
+        try:
+            result, _ = _JSON_DECODER.raw_decode(text, start)
+            if isinstance(result, dict):
+                return result
+        except json.JSONDecodeError:
+            pass
+    raise ValueError("Failed to parse hidden layer output")
+
+
+def _layers_schema(keys: tuple):
+    """Structured-output schema: one required Markdown string per layer key."""
+    from google.genai import types
+
+    return types.Schema(
+        type=types.Type.OBJECT,
+        properties={key: types.Schema(type=types.Type.STRING) for key in keys},
+        required=list(keys),
+    )
+
+
+@dataclass(slots=True, frozen=True)
 class LayeredReportResult:
     """Result of layered report generation."""
     layer_0: str  # Executive Snapshot
@@ -57,10 +112,82 @@ class PreMarketAnalyzer:
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not set in environment")
 
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
+        # Imported here so that importing LayeredReportResult alone does not
+        # load the Gemini SDK
+        from src.analyzers.gemini_client import get_client
+        from src.analyzers.llm_cache import ResponseCache
+
+        self.client = get_client()
         self.model = GEMINI_MODEL
+        self.cache = ResponseCache()
 
-    def process_hidden_layer(
+    async def _cached_generate(
+        self,
+        prompt: str,
+        temperature: float,
+        max_output_tokens: int,
+        layer_keys: tuple = (),
+        parse=None,
+    ):
+        """
+        Generate text for prompt, reusing a cached response for an identical
+        request (same model, prompt and settings) within the cache TTL.
+
+        With layer_keys, the response is a JSON object with one string per
+        key (structured output), returned as a tuple of layers in key order.
+        Otherwise parse, if given, is applied to the text and its result
+        returned. A response that fails to parse raises and is not cached,
+        so a rerun asks the model again. The response is streamed; each
+        "### Layer N" header is reported as soon as it arrives instead of
+        after the whole completion.
+        """
+        from google.genai import types
+        from src.analyzers.gemini_client import stream_with_retry_async
+
+        key = self.cache.make_key(
+            model=self.model,
+            prompt=prompt,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            layer_keys=list(layer_keys),
+        )
+        if layer_keys:
+            parse = lambda text: _parse_layers(text, layer_keys)
+
+        text = self.cache.get(key)
+        if text is not None:
+            return parse(text) if parse else text
+
+        parts = []
+        tail = ""  # End of the previous chunk, for headers split across chunks
+        seen_layers = set()
+        async for chunk in stream_with_retry_async(
+            self.client,
+            model=self.model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                temperature=temperature,
+                max_output_tokens=max_output_tokens,
+                response_mime_type="application/json" if layer_keys else None,
+                response_schema=_layers_schema(layer_keys) if layer_keys else None,
+            ),
+        ):
+            chunk_text = chunk.text or ""
+            parts.append(chunk_text)
+            window = tail + chunk_text
+            for match in _LAYER_HEADER_RE.finditer(window):
+                layer = match.group(1)
+                if layer not in seen_layers:
+                    seen_layers.add(layer)
+                    print(f"      ↳ Layer {layer} streaming...")
+            tail = window[-16:]
+
+        text = "".join(parts)
+        result = parse(text) if parse else text
+        self.cache.put(key, text)
+        return result
+
+    async def process_hidden_layer(
         self,
         yesterday_report: dict,
         news_data: str,
@@ -82,46 +209,34 @@ class PreMarketAnalyzer:
             Dict with processed changes (macro, industry, company)
         """
         yesterday_content = yesterday_report.get("content", "")
-        if not yesterday_report.get("available", False):
-            yesterday_content = "【昨日報告不可用】\n" + yesterday_report.get("fallback_note", "")
-
-        prompt = HIDDEN_LAYER_PROMPT.format(
-            yesterday_report=yesterday_content[:8000] if yesterday_content else "無昨日報告",
-            news_data=news_data[:6000],
-            sec_data=sec_data[:2000] if sec_data else "無 SEC 公告",
-            fda_data=fda_data[:2000] if fda_data else "無 FDA 動態",
-            market_data=market_data,
+        yesterday_unavailable = not yesterday_report.get("available", False)
+        yesterday_note = yesterday_report.get("fallback_note", "")
+        if yesterday_unavailable:
+            yesterday_content = "【昨日報告不可用】\n" + yesterday_note
+
+        prompt = build_prompt(
+            HIDDEN_LAYER_PROMPT,
+            HIDDEN_LAYER_INPUT.format(
+                yesterday_report=yesterday_content[:8000] if yesterday_content else "無昨日報告",
+                news_data=news_data,
+                sec_data=sec_data[:2000] if sec_data else "無 SEC 公告",
+                fda_data=fda_data[:2000] if fda_data else "無 FDA 動態",
+                market_data=market_data,
+            ),
         )
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.2,
-                    max_output_tokens=3000,
-                ),
+            result = await self._cached_generate(
+                prompt,
+                temperature=0.2,
+                max_output_tokens=3000,
+                parse=_parse_hidden_layer,
             )
 
-            # Parse JSON from response
-            text = response.text
-            json_match = re.search(r'\{[\s\S]*\}', text)
-            if json_match:
-                result = json.loads(json_match.group())
-                # Add yesterday availability info
-                result["yesterday_unavailable"] = not yesterday_report.get("available", False)
-                result["yesterday_note"] = yesterday_report.get("fallback_note", "")
-                return result
-            else:
-                return {
-                    "macro_changes": [],
-                    "industry_changes": [],
-                    "company_changes": [],
-                    "filtered_noise": [],
-                    "yesterday_unavailable": not yesterday_report.get("available", False),
-                    "yesterday_note": yesterday_report.get("fallback_note", ""),
-                    "error": "Failed to parse hidden layer output",
-                }
+            # Add yesterday availability info
+            result["yesterday_unavailable"] = yesterday_unavailable
+            result["yesterday_note"] = yesterday_note
+            return result
 
         except Exception as e:
             return {
@@ -129,266 +244,114 @@ class PreMarketAnalyzer:
                 "industry_changes": [],
                 "company_changes": [],
                 "filtered_noise": [],
-                "yesterday_unavailable": not yesterday_report.get("available", False),
-                "yesterday_note": yesterday_report.get("fallback_note", ""),
+                "yesterday_unavailable": yesterday_unavailable,
+                "yesterday_note": yesterday_note,
                 "error": str(e),
             }
 
-    def _generate_layer_0_1(
+    async def _generate_layer_0_1(
         self,
         hidden_layer_output: dict,
+        hidden_layer_json: str,
         market_data: str,
         news_data: str,
     ) -> tuple[str, str]:
-        """Generate Layer 0 (Executive Snapshot) and Layer 1 (What Changed Today)."""
+        """
+        Generate Layer 0 (Executive Snapshot) and Layer 1 (What Changed Today).
+
+        hidden_layer_json is hidden_layer_output already serialized (compact)
+        by the caller; the dict is only read for the yesterday warning.
+        """
         # Prepare yesterday warning if needed
         yesterday_warning = ""
         if hidden_layer_output.get("yesterday_unavailable", False):
             note = hidden_layer_output.get("yesterday_note", "昨日報告不可用")
             yesterday_warning = f"\n**注意**：在 Layer 0 的開頭加入以下警告：\n⚠️ {note}\n"
 
-        prompt = LAYER_0_1_PROMPT.format(
-            hidden_layer_output=json.dumps(hidden_layer_output, ensure_ascii=False, indent=2),
-            market_data=market_data,
-            news_data=news_data[:4000],
-            yesterday_warning=yesterday_warning,
+        prompt = build_prompt(
+            LAYER_0_1_PROMPT,
+            LAYER_0_1_INPUT.format(
+                hidden_layer_output=hidden_layer_json,
+                market_data=market_data,
+                news_data=news_data,
+                yesterday_warning=yesterday_warning,
+            ),
         )
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=4000,
-                ),
-            )
-
-            text = response.text
-
-            # Split into Layer 0 and Layer 1
-            layer_0 = ""
-            layer_1 = ""
-
-            # Find Layer 0 section
-            layer_0_match = re.search(
-                r'### Layer 0.*?(?=### Layer 1|$)',
-                text,
-                re.DOTALL | re.IGNORECASE
-            )
-            if layer_0_match:
-                layer_0 = layer_0_match.group().strip()
-
-            # Find Layer 1 section
-            layer_1_match = re.search(
-                r'### Layer 1.*',
-                text,
-                re.DOTALL | re.IGNORECASE
+            return await self._cached_generate(
+                prompt,
+                temperature=0.3,
+                max_output_tokens=4000,
+                layer_keys=LAYER_0_1_KEYS,
             )
-            if layer_1_match:
-                layer_1 = layer_1_match.group().strip()
-
-            # If parsing failed, use full response
-            if not layer_0 and not layer_1:
-                parts = text.split("Layer 1", 1)
-                if len(parts) == 2:
-                    layer_0 = parts[0].strip()
-                    layer_1 = "Layer 1" + parts[1].strip()
-                else:
-                    layer_0 = text
-                    layer_1 = ""
-
-            return layer_0, layer_1
 
         except Exception as e:
             return f"生成 Layer 0-1 時發生錯誤: {e}", ""
 
-    def _generate_layer_2_3(
+    async def _generate_layer_2_5(
         self,
         layer_0_content: str,
         layer_1_content: str,
         market_data: str,
-    ) -> tuple[str, str]:
-        """Generate Layer 2 (Structural Interpretation) and Layer 3 (Asset Allocation)."""
-        prompt = LAYER_2_3_PROMPT.format(
-            layer_0_content=layer_0_content,
-            layer_1_content=layer_1_content,
-            market_data=market_data,
-        )
-
-        try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=3000,
-                ),
-            )
-
-            text = response.text
-
-            # Split into Layer 2 and Layer 3
-            layer_2 = ""
-            layer_3 = ""
-
-            # Find Layer 2 section
-            layer_2_match = re.search(
-                r'### Layer 2.*?(?=### Layer 3|$)',
-                text,
-                re.DOTALL | re.IGNORECASE
-            )
-            if layer_2_match:
-                layer_2 = layer_2_match.group().strip()
-
-            # Find Layer 3 section
-            layer_3_match = re.search(
-                r'### Layer 3.*',
-                text,
-                re.DOTALL | re.IGNORECASE
-            )
-            if layer_3_match:
-                layer_3 = layer_3_match.group().strip()
-
-            # If parsing failed, try alternative split
-            if not layer_2 and not layer_3:
-                parts = text.split("Layer 3", 1)
-                if len(parts) == 2:
-                    layer_2 = parts[0].strip()
-                    layer_3 = "Layer 3" + parts[1].strip()
-                else:
-                    layer_2 = text
-                    layer_3 = ""
-
-            return layer_2, layer_3
-
-        except Exception as e:
-            return f"生成 Layer 2-3 時發生錯誤: {e}", ""
-
-    def _generate_layer_4_5(
-        self,
-        layer_0_content: str,
-        layer_1_content: str,
-        layer_2_content: str,
-        layer_3_content: str,
         watchlist_data: str,
-        company_changes: list,
-    ) -> tuple[str, str]:
-        """Generate Layer 4 (Equity Signals) and Layer 5 (Decision Log)."""
-        prompt = LAYER_4_5_PROMPT.format(
-            layer_0_content=layer_0_content,
-            layer_1_content=layer_1_content,
-            layer_2_content=layer_2_content,
-            layer_3_content=layer_3_content,
-            watchlist_data=watchlist_data[:3000],
-            company_changes=json.dumps(company_changes, ensure_ascii=False, indent=2) if company_changes else "無公司變化",
+        company_changes_json: str,
+    ) -> tuple[str, str, str, str]:
+        """
+        Generate Layer 2 (Structural Interpretation), Layer 3 (Asset Allocation),
+        Layer 4 (Equity Signals) and Layer 5 (Decision Log) in one call.
+
+        Layer 4-5 build on Layer 2-3, which the model writes earlier in the
+        same response, so the earlier layers are not re-sent in a second call.
+        company_changes_json is the serialized company changes, or "" if none.
+        """
+        prompt = build_prompt(
+            LAYER_2_5_PROMPT,
+            LAYER_2_5_INPUT.format(
+                layer_0_content=layer_0_content,
+                layer_1_content=layer_1_content,
+                market_data=market_data,
+                watchlist_data=watchlist_data[:3000],
+                company_changes=company_changes_json or "無公司變化",
+            ),
         )
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=3000,
-                ),
-            )
-
-            text = response.text
-
-            # Split into Layer 4 and Layer 5
-            layer_4 = ""
-            layer_5 = ""
-
-            # Find Layer 4 section
-            layer_4_match = re.search(
-                r'### Layer 4.*?(?=### Layer 5|$)',
-                text,
-                re.DOTALL | re.IGNORECASE
+            return await self._cached_generate(
+                prompt,
+                temperature=0.3,
+                max_output_tokens=6000,
+                layer_keys=LAYER_2_5_KEYS,
             )
-            if layer_4_match:
-                layer_4 = layer_4_match.group().strip()
-
-            # Find Layer 5 section
-            layer_5_match = re.search(
-                r'### Layer 5.*',
-                text,
-                re.DOTALL | re.IGNORECASE
-            )
-            if layer_5_match:
-                layer_5 = layer_5_match.group().strip()
-
-            # If parsing failed, try alternative split
-            if not layer_4 and not layer_5:
-                parts = text.split("Layer 5", 1)
-                if len(parts) == 2:
-                    layer_4 = parts[0].strip()
-                    layer_5 = "Layer 5" + parts[1].strip()
-                else:
-                    layer_4 = text
-                    layer_5 = ""
-
-            return layer_4, layer_5
 
         except Exception as e:
-            return f"生成 Layer 4-5 時發生錯誤: {e}", ""
+            return f"生成 Layer 2-5 時發生錯誤: {e}", "", "", ""
 
-    def generate_news_summary(
+    async def generate_news_summary(
         self,
         news_data: str,
         market_data: str,
     ) -> str:
         """Generate paragraph-style news summary."""
-        prompt = NEWS_SUMMARY_PROMPT.format(
-            news_data=news_data[:5000],
-            market_data=market_data,
+        prompt = build_prompt(
+            NEWS_SUMMARY_PROMPT,
+            NEWS_SUMMARY_INPUT.format(
+                news_data=news_data,
+                market_data=market_data,
+            ),
         )
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=1000,
-                ),
+            text = await self._cached_generate(
+                prompt,
+                temperature=0.3,
+                max_output_tokens=1000,
             )
-            return response.text.strip()
+            return text.strip()
 
         except Exception as e:
             return f"無法生成新聞摘要: {e}"
 
-    def _format_market_appendix(self, market_overview) -> str:
-        """Format market data as appendix table."""
-        lines = ["## 📊 市場數據附錄\n"]
-
-        # Index table
-        lines.append("| 指數 | 收盤價 | 漲跌幅 |")
-        lines.append("|------|--------|--------|")
-
-        if market_overview.sp500:
-            lines.append(
-                f"| S&P 500 | {market_overview.sp500.current_price:,.2f} | "
-                f"{market_overview.sp500.change_percent:+.2f}% |"
-            )
-        if market_overview.nasdaq:
-            lines.append(
-                f"| NASDAQ | {market_overview.nasdaq.current_price:,.2f} | "
-                f"{market_overview.nasdaq.change_percent:+.2f}% |"
-            )
-        if market_overview.dow:
-            lines.append(
-                f"| Dow Jones | {market_overview.dow.current_price:,.2f} | "
-                f"{market_overview.dow.change_percent:+.2f}% |"
-            )
-        if market_overview.vix:
-            lines.append(
-                f"| VIX | {market_overview.vix:.2f} | "
-                f"{market_overview.vix_change:+.2f}% |"
-            )
-
-        return "\n".join(lines)
-
     def extract_hashtags_from_report(
         self,
         layer_4_content: str,
@@ -412,12 +375,19 @@ class PreMarketAnalyzer:
 
         # 1. Add watchlist symbols that appear in Layer 4 content
         if watchlist_symbols:
+            # Tokenize the content once and intersect with the watchlist
+            found = set(_UPPER_TOKEN_RE.findall(layer_4_content)) & watchlist_symbols
+            # Symbols the tokenizer cannot produce (e.g. "BRK.B") keep a regex check
+            irregular = [symbol for symbol in watchlist_symbols if not _UPPER_TOKEN_RE.fullmatch(symbol)]
+            if irregular:
+                symbol_re = re.compile(
+                    r'\b(' + '|'.join(re.escape(symbol) for symbol in irregular) + r')\b'
+                )
+                found.update(symbol_re.findall(layer_4_content))
             for symbol in watchlist_symbols:
-                # Check if symbol appears in content (with word boundary)
-                if re.search(rf'\b{symbol}\b', layer_4_content):
-                    if symbol not in seen:
-                        tickers.append(symbol)
-                        seen.add(symbol)
+                if symbol in found and symbol not in seen:
+                    tickers.append(symbol)
+                    seen.add(symbol)
 
         # 2. Add discovered symbols from 4B section
         if discovered_symbols:
@@ -427,24 +397,17 @@ class PreMarketAnalyzer:
                     seen.add(symbol)
 
         # 3. Try to extract tickers from 4B section if discovered_symbols not provided
-        if not discovered_symbols:
+        # (cheap substring checks first: the 4B header needs "新發現" and each
+        # ticker pattern needs its marker character)
+        if not discovered_symbols and "新發現" in layer_4_content:
             # Look for 4B section and extract tickers there
-            section_4b_match = re.search(
-                r'4B[:\s]*新發現.*?(?=###|$)',
-                layer_4_content,
-                re.DOTALL | re.IGNORECASE
-            )
+            section_4b_match = _SECTION_4B_RE.search(layer_4_content)
             if section_4b_match:
                 section_4b = section_4b_match.group()
-                # Pattern: $TICKER or (TICKER) or **TICKER**
-                ticker_patterns = [
-                    r'\$([A-Z]{1,5})\b',           # $AAPL
-                    r'\(([A-Z]{1,5})\)',            # (AAPL)
-                    r'\*\*([A-Z]{1,5})\*\*',       # **AAPL**
-                    r'【([A-Z]{1,5})】',            # 【AAPL】
-                ]
-                for pattern in ticker_patterns:
-                    matches = re.findall(pattern, section_4b)
+                for marker, pattern in _TICKER_RES:
+                    if marker not in section_4b:
+                        continue
+                    matches = pattern.findall(section_4b)
                     for match in matches:
                         if match not in seen and len(match) >= 2:
                             tickers.append(match)
@@ -464,10 +427,14 @@ class PreMarketAnalyzer:
         """
         Generate complete layered pre-market report.
 
-        Uses 3-stage LLM calls:
-        1. Hidden Layer + Layer 0-1 (~4000 tokens)
-        2. Layer 2-3 (~2000 tokens)
-        3. Layer 4-5 + News Summary (~3000 tokens)
+        Uses 4 LLM calls:
+        1. Hidden Layer (~3000 tokens)
+        2. Layer 0-1 (~4000 tokens)
+        3. Layer 2-5 (~6000 tokens)
+        4. News Summary (~1000 tokens)
+
+        The news summary only needs the news and market data, so it runs
+        concurrently with the layer chain.
 
         Args:
             yesterday_report: Dict from get_yesterday_pre_market()
@@ -480,62 +447,91 @@ class PreMarketAnalyzer:
         Returns:
             LayeredReportResult with all layers and metadata
         """
+        from src.analyzers.gemini_client import run_sync
+
+        return run_sync(
+            self._generate_layered_report_async(
+                yesterday_report,
+                news_items,
+                market_overview,
+                watchlist_stocks,
+                sec_summary,
+                fda_summary,
+            )
+        )
+
+    async def _generate_layered_report_async(
+        self,
+        yesterday_report: dict,
+        news_items: list,
+        market_overview,
+        watchlist_stocks: list,
+        sec_summary: str = "",
+        fda_summary: str = "",
+    ) -> LayeredReportResult:
+        """Async implementation of generate_layered_report."""
         # Format input data
         news_data = "\n".join([
             f"- [{n.source}] {n.title}"
             for n in news_items[:50]
         ])
 
-        market_data = self._format_market_data(market_overview)
+        market_data, market_appendix = self._format_market_both(market_overview)
         watchlist_data = self._format_watchlist_data(watchlist_stocks)
 
+        # Each stage's news excerpt is cut once, by estimated tokens
+        news_for_hidden = truncate_to_tokens(news_data, PRE_MARKET_HIDDEN_NEWS_TOKENS)
+        news_for_layers = truncate_to_tokens(news_data, PRE_MARKET_LAYER_NEWS_TOKENS)
+        news_for_summary = truncate_to_tokens(news_data, PRE_MARKET_SUMMARY_NEWS_TOKENS)
+
+        # News summary is independent of the layer chain: start it right away
+        print("   Generating news summary...")
+        news_summary_task = asyncio.create_task(
+            self.generate_news_summary(
+                news_data=news_for_summary,
+                market_data=market_data,
+            )
+        )
+
         # Stage 1: Hidden Layer processing
         print("   Processing Hidden Layer...")
-        hidden_output = self.process_hidden_layer(
+        hidden_output = await self.process_hidden_layer(
             yesterday_report=yesterday_report,
-            news_data=news_data,
+            news_data=news_for_hidden,
             sec_data=sec_summary,
             fda_data=fda_summary,
             market_data=market_data,
         )
 
+        # Serialize the hidden output once for the layer prompts (compact form)
+        hidden_json = json.dumps(hidden_output, ensure_ascii=False, separators=(',', ':'))
+        company_changes = hidden_output.get("company_changes", [])
+        company_json = (
+            json.dumps(company_changes, ensure_ascii=False, separators=(',', ':'))
+            if company_changes else ""
+        )
+
         # Stage 2: Generate Layer 0-1
         print("   Generating Layer 0-1...")
-        layer_0, layer_1 = self._generate_layer_0_1(
+        layer_0, layer_1 = await self._generate_layer_0_1(
             hidden_layer_output=hidden_output,
+            hidden_layer_json=hidden_json,
             market_data=market_data,
-            news_data=news_data,
+            news_data=news_for_layers,
         )
 
-        # Stage 3: Generate Layer 2-3
-        print("   Generating Layer 2-3...")
-        layer_2, layer_3 = self._generate_layer_2_3(
+        # Stage 3: Generate Layer 2-5
+        print("   Generating Layer 2-5...")
+        layer_2, layer_3, layer_4, layer_5 = await self._generate_layer_2_5(
             layer_0_content=layer_0,
             layer_1_content=layer_1,
             market_data=market_data,
-        )
-
-        # Stage 4: Generate Layer 4-5
-        print("   Generating Layer 4-5...")
-        company_changes = hidden_output.get("company_changes", [])
-        layer_4, layer_5 = self._generate_layer_4_5(
-            layer_0_content=layer_0,
-            layer_1_content=layer_1,
-            layer_2_content=layer_2,
-            layer_3_content=layer_3,
             watchlist_data=watchlist_data,
-            company_changes=company_changes,
-        )
-
-        # Stage 5: Generate News Summary
-        print("   Generating news summary...")
-        news_summary = self.generate_news_summary(
-            news_data=news_data,
-            market_data=market_data,
+            company_changes_json=company_json,
         )
 
-        # Format market appendix
-        market_appendix = self._format_market_appendix(market_overview)
+        # Stage 4: Collect News Summary
+        news_summary = await news_summary_task
 
         # Extract tickers from Layer 4 (only watchlist + discovered)
         watchlist_symbols = {s.symbol for s in watchlist_stocks} if watchlist_stocks else set()
@@ -558,19 +554,40 @@ class PreMarketAnalyzer:
             extracted_tickers=extracted_tickers,
         )
 
-    def _format_market_data(self, overview) -> str:
-        """Format market overview for prompts."""
-        lines = []
-        if overview.sp500:
-            lines.append(f"S&P 500: {overview.sp500.current_price:,.2f} ({overview.sp500.change_percent:+.2f}%)")
-        if overview.nasdaq:
-            lines.append(f"NASDAQ: {overview.nasdaq.current_price:,.2f} ({overview.nasdaq.change_percent:+.2f}%)")
-        if overview.dow:
-            lines.append(f"Dow Jones: {overview.dow.current_price:,.2f} ({overview.dow.change_percent:+.2f}%)")
+    def _format_market_both(self, overview) -> tuple[str, str]:
+        """
+        Format the market overview in one pass over the indices.
+
+        Returns:
+            (prompt_text, appendix_table): the plain lines fed to the
+            prompts and the Markdown appendix table for the report
+        """
+        prompt_lines = []
+        appendix_lines = [
+            "## 📊 市場數據附錄\n",
+            "| 指數 | 收盤價 | 漲跌幅 |",
+            "|------|--------|--------|",
+        ]
+
+        for label, index in (
+            ("S&P 500", overview.sp500),
+            ("NASDAQ", overview.nasdaq),
+            ("Dow Jones", overview.dow),
+        ):
+            if index:
+                price = f"{index.current_price:,.2f}"
+                change = f"{index.change_percent:+.2f}%"
+                prompt_lines.append(f"{label}: {price} ({change})")
+                appendix_lines.append(f"| {label} | {price} | {change} |")
+
         if overview.vix:
-            lines.append(f"VIX: {overview.vix:.2f} ({overview.vix_change:+.2f}%)")
-        lines.append(f"市場情緒: {overview.market_sentiment}")
-        return "\n".join(lines)
+            vix = f"{overview.vix:.2f}"
+            vix_change = f"{overview.vix_change:+.2f}%"
+            prompt_lines.append(f"VIX: {vix} ({vix_change})")
+            appendix_lines.append(f"| VIX | {vix} | {vix_change} |")
+
+        prompt_lines.append(f"市場情緒: {overview.market_sentiment}")
+        return "\n".join(prompt_lines), "\n".join(appendix_lines)
 
     def _format_watchlist_data(self, stocks: list) -> str:
         """Format watchlist stocks for prompts."""
@@ -2,18 +2,28 @@
 Pre-Market V3 Analyzer
 Generates a focused pre-market brief based on structured data.
 """
+import heapq
 import json
 import re
+from collections import defaultdict
+from datetime import datetime
+from operator import itemgetter
 from typing import Optional
 
-from google import genai
 from google.genai import types
 
+import numpy as np
 import pytz
 
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+try:
+    import ahocorasick  # Optional (pyahocorasick): one-pass company-name matching
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson  # Optional: faster data-pack serialization and response parsing
+except ImportError:
+    orjson = None
 
 from src.config.settings import (
     GEMINI_API_KEY,
@@ -21,10 +31,69 @@ from src.config.settings import (
     TIMEZONE,
     US_EASTERN_TZ,
 )
+from src.analyzers.gemini_client import get_client, generate_with_retry_async, run_sync
+from src.analyzers.llm_cache import ResponseCache
 from src.prompts.pre_market import PRE_MARKET_V3_PROMPT
 from src.collectors.universe import UniverseData
 
 
+def _string_list() -> types.Schema:
+    """Structured-output schema: array of strings."""
+    return types.Schema(type=types.Type.ARRAY, items=types.Schema(type=types.Type.STRING))
+
+
+def _object_list(keys: tuple) -> types.Schema:
+    """Structured-output schema: array of objects with required string keys."""
+    return types.Schema(
+        type=types.Type.ARRAY,
+        items=types.Schema(
+            type=types.Type.OBJECT,
+            properties={key: types.Schema(type=types.Type.STRING) for key in keys},
+            required=list(keys),
+        ),
+    )
+
+
+# Structured output: the sections listed in PRE_MARKET_V3_PROMPT
+SECTIONS_RESPONSE_SCHEMA = types.Schema(
+    type=types.Type.OBJECT,
+    properties={
+        "key_takeaways": _string_list(),
+        "geo_events": _string_list(),
+        "market_state": _string_list(),
+        "watchlist_focus": _object_list(("symbol", "why", "watch")),
+        "event_driven": _object_list(("symbol", "why", "impact")),
+        "monitor_list": _string_list(),
+    },
+    required=[
+        "key_takeaways",
+        "geo_events",
+        "market_state",
+        "watchlist_focus",
+        "event_driven",
+        "monitor_list",
+    ],
+)
+
+# Most candidates of each kind passed on to the data pack
+MAX_CANDIDATES = 15
+
+# Timezones shared by every analyzer instance
+_TZ_TAIPEI = pytz.timezone(TIMEZONE)
+_TZ_ET = pytz.timezone(US_EASTERN_TZ)
+
+# Helpers used per news item / per response, built once
+_JSON_DECODER = json.JSONDecoder()
+_TICKER_RE = re.compile(r"\b[A-Z]{1,5}\b")
+
+# bytes.translate table for _normalize_text: ASCII lowercase letters and
+# digits are kept, every other byte becomes a space
+_NORMALIZE_TABLE = bytes(
+    c if (ord("a") <= c <= ord("z") or ord("0") <= c <= ord("9")) else ord(" ")
+    for c in range(256)
+)
+
+
 class PreMarketV3Analyzer:
     """Analyzer for generating Pre-market V3 report sections."""
 
@@ -32,10 +101,13 @@ class PreMarketV3Analyzer:
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not set in environment")
 
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
+        self.client = get_client()
         self.model = GEMINI_MODEL
-        self.tz_taipei = pytz.timezone(TIMEZONE)
-        self.tz_et = pytz.timezone(US_EASTERN_TZ)
+        self.cache = ResponseCache()
+        self.tz_taipei = _TZ_TAIPEI
+        self.tz_et = _TZ_ET
+        self._name_automaton = None
+        self._name_automaton_universe = None
 
     def generate_sections(
         self,
@@ -51,29 +123,115 @@ class PreMarketV3Analyzer:
             sections: dict of report sections
             meta: dict with symbols and news digest
         """
+        return run_sync(
+            self.generate_sections_async(
+                market_overview,
+                economic_events,
+                earnings_events,
+                news_items,
+                watchlist_stocks,
+                universe_data,
+            )
+        )
+
+    async def generate_sections_async(
+        self,
+        market_overview,
+        economic_events: list,
+        earnings_events: list,
+        news_items: list,
+        watchlist_stocks: list,
+        universe_data: UniverseData,
+    ) -> tuple[dict, dict]:
+        """
+        Async implementation of generate_sections, so callers can gather it
+        with other LLM-bound work.
+        """
+        data_pack, candidates = self.build_data_pack(
+            market_overview,
+            economic_events,
+            earnings_events,
+            news_items,
+            watchlist_stocks,
+            universe_data,
+        )
+
+        prompt = PRE_MARKET_V3_PROMPT.format(data_pack=_dump_data_pack(data_pack))
+
+        # The data pack is fully determined by the inputs, so a rerun on
+        # unchanged data reuses the stored response
+        temperature = 0.2
+        max_output_tokens = 2500
+        key = self.cache.make_key(
+            model=self.model,
+            prompt=prompt,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            response_mime_type="application/json",
+            response_schema=SECTIONS_RESPONSE_SCHEMA.model_dump(mode="json", exclude_none=True),
+        )
+        text = self.cache.get(key)
+        if text is None:
+            response = await generate_with_retry_async(
+                self.client,
+                model=self.model,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    temperature=temperature,
+                    max_output_tokens=max_output_tokens,
+                    response_mime_type="application/json",
+                    response_schema=SECTIONS_RESPONSE_SCHEMA,
+                ),
+            )
+            text = response.text
+            # An unparsable reply would only ever give the fallback sections:
+            # leave it out of the cache so a rerun asks the model again
+            if text and self._parse_json(text):
+                self.cache.put(key, text)
+
+        return self.finish_sections(text, candidates)
+
+    def build_data_pack(
+        self,
+        market_overview,
+        economic_events: list,
+        earnings_events: list,
+        news_items: list,
+        watchlist_stocks: list,
+        universe_data: UniverseData,
+    ) -> tuple[dict, dict]:
+        """
+        Build the JSON data pack for the model, without calling it.
+
+        Returns:
+            data_pack: dict serialized into PRE_MARKET_V3_PROMPT
+            candidates: dict with watchlist/event candidates and news digest,
+                to pass to finish_sections with the model's response
+        """
+        # Ticker-tagged news, indexed once for the candidate builders
+        news_by_ticker = defaultdict(list)
+        for item in news_items:
+            for ticker in item.related_tickers or []:
+                news_by_ticker[ticker].append(item)
+
         watchlist_candidates, watchlist_symbols = self._build_watchlist_candidates(
-            watchlist_stocks, news_items, earnings_events
+            watchlist_stocks, news_by_ticker, earnings_events
         )
         event_candidates, event_symbols = self._build_event_driven_candidates(
             news_items, universe_data, watchlist_symbols
         )
         news_digest = self._build_news_digest(news_items)
 
-        data_pack = {
-            "market_overview": self._format_market_overview(market_overview),
-            "economic_events": [
-                {
-                    "time_et": e.to_report_row(self.tz_taipei)["time_et"],
-                    "time_taipei": e.to_report_row(self.tz_taipei)["time_taipei"],
-                    "country": e.country,
-                    "event": e.event,
-                    "importance": e.importance,
-                    "forecast": e.forecast,
-                    "previous": e.previous,
-                }
-                for e in economic_events[:12]
-            ],
-            "earnings_events": [
+        # Empty sections are left out instead of sent as [] (fewer prompt
+        # tokens); the prompt treats a missing section as no data
+        data_pack = {"market_overview": self._format_market_overview(market_overview)}
+        if economic_events:
+            # to_report_row already carries every field, in this key order
+            data_pack["economic_events"] = [
+                e.to_report_row(self.tz_taipei) for e in economic_events[:12]
+            ]
+        if earnings_events:
+            data_pack["earnings_events"] = [
                 {
                     "symbol": e.symbol,
                     "company": e.company,
@@ -83,26 +241,32 @@ class PreMarketV3Analyzer:
                     "revenue_estimate": e.revenue_estimate,
                 }
                 for e in earnings_events[:20]
-            ],
-            "news_highlights": news_digest[:20],
-            "watchlist_candidates": watchlist_candidates[:15],
-            "event_driven_candidates": event_candidates[:15],
+            ]
+        if news_digest:
+            data_pack["news_highlights"] = news_digest[:20]
+        if watchlist_candidates:
+            data_pack["watchlist_candidates"] = watchlist_candidates
+        if event_candidates:
+            data_pack["event_driven_candidates"] = event_candidates
+
+        candidates = {
+            "watchlist_candidates": watchlist_candidates,
+            "event_candidates": event_candidates,
+            "news_digest": news_digest,
         }
+        return data_pack, candidates
 
-        prompt = PRE_MARKET_V3_PROMPT.format(
-            data_pack=json.dumps(data_pack, ensure_ascii=False, indent=2)
-        )
+    def finish_sections(self, text: str, candidates: dict) -> tuple[dict, dict]:
+        """
+        Parse the model's response for a data pack into (sections, meta).
 
-        response = self.client.models.generate_content(
-            model=self.model,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.2,
-                max_output_tokens=2500,
-            ),
-        )
+        Falls back to candidate-based sections if the response has no
+        parsable JSON object.
+        """
+        watchlist_candidates = candidates["watchlist_candidates"]
+        event_candidates = candidates["event_candidates"]
 
-        sections = self._parse_json(response.text)
+        sections = self._parse_json(text)
 
         if not sections:
             sections = self._fallback_sections(watchlist_candidates, event_candidates)
@@ -110,57 +274,71 @@ class PreMarketV3Analyzer:
         meta = {
             "watchlist_focus_symbols": [c["symbol"] for c in watchlist_candidates[:8]],
             "event_driven_symbols": [c["symbol"] for c in event_candidates[:8]],
-            "news_digest": news_digest[:12],
+            "news_digest": candidates["news_digest"][:12],
         }
 
         return sections, meta
 
-    def _build_watchlist_candidates(self, stocks, news_items, earnings_events):
+    def _build_watchlist_candidates(self, stocks, news_by_ticker: dict, earnings_events):
         earnings_symbols = {e.symbol for e in earnings_events}
-        news_symbols = set()
-        for item in news_items:
-            for t in item.related_tickers or []:
-                news_symbols.add(t)
+
+        count = len(stocks)
+
+        def column(attr: str) -> np.ndarray:
+            # Missing (None/0) values become NaN, which fails every threshold
+            return np.fromiter(
+                (getattr(s, attr) or np.nan for s in stocks), dtype=np.float64, count=count
+            )
+
+        def flags(predicate) -> np.ndarray:
+            return np.fromiter((bool(predicate(s)) for s in stocks), dtype=bool, count=count)
+
+        change_percent = np.abs(column("change_percent"))
+        change_1w = np.abs(column("change_1w"))
+        rsi = column("rsi_14")
+        volume_ratio = column("volume_ratio")
+
+        # (mask over stocks, weight, reason) rules, in reason order; the
+        # numeric thresholds are evaluated for the whole watchlist at once
+        rules = (
+            (flags(lambda s: s.symbol in earnings_symbols), 3, lambda s: "今日財報"),
+            (flags(lambda s: s.symbol in news_by_ticker), 2, lambda s: "今日新聞提及"),
+            (change_percent >= 2, 1, lambda s: f"單日波動 {s.change_percent:+.2f}%"),
+            (change_1w >= 5, 1, lambda s: f"近一週 {s.change_1w:+.2f}%"),
+            (rsi >= 70, 1, lambda s: f"RSI {s.rsi_14:.0f} 超買"),
+            (rsi <= 30, 1, lambda s: f"RSI {s.rsi_14:.0f} 超賣"),
+            (volume_ratio >= 1.5, 1, lambda s: f"成交量放大 {s.volume_ratio:.2f}x"),
+            (
+                flags(lambda s: s.support_levels and _near_level(s.current_price, s.support_levels)),
+                1,
+                lambda s: "接近支撐位",
+            ),
+            (
+                flags(lambda s: s.resistance_levels and _near_level(s.current_price, s.resistance_levels)),
+                1,
+                lambda s: "接近壓力位",
+            ),
+        )
+
+        scores = np.zeros(count, dtype=np.int64)
+        for mask, weight, _ in rules:
+            scores += weight * mask
+
+        # Sort keys are computed once per scored stock; only the top
+        # MAX_CANDIDATES are turned into candidate dicts. Every scored stock
+        # is still excluded from the event-driven list.
+        scored = np.flatnonzero(scores)
+        symbols = {stocks[i].symbol for i in scored}
+        keyed = [
+            ((int(scores[i]), abs(round(stocks[i].change_percent, 2))), i)
+            for i in scored
+        ]
+        top = heapq.nlargest(MAX_CANDIDATES, keyed, key=itemgetter(0))
 
         candidates = []
-        for stock in stocks:
-            reasons = []
-            score = 0
-
-            if stock.symbol in earnings_symbols:
-                reasons.append("今日財報")
-                score += 3
-            if stock.symbol in news_symbols:
-                reasons.append("今日新聞提及")
-                score += 2
-            if abs(stock.change_percent) >= 2:
-                reasons.append(f"單日波動 {stock.change_percent:+.2f}%")
-                score += 1
-            if stock.change_1w and abs(stock.change_1w) >= 5:
-                reasons.append(f"近一週 {stock.change_1w:+.2f}%")
-                score += 1
-            if stock.rsi_14:
-                if stock.rsi_14 >= 70:
-                    reasons.append(f"RSI {stock.rsi_14:.0f} 超買")
-                    score += 1
-                elif stock.rsi_14 <= 30:
-                    reasons.append(f"RSI {stock.rsi_14:.0f} 超賣")
-                    score += 1
-            if stock.volume_ratio and stock.volume_ratio >= 1.5:
-                reasons.append(f"成交量放大 {stock.volume_ratio:.2f}x")
-                score += 1
-
-            if stock.support_levels:
-                if _near_level(stock.current_price, stock.support_levels):
-                    reasons.append("接近支撐位")
-                    score += 1
-            if stock.resistance_levels:
-                if _near_level(stock.current_price, stock.resistance_levels):
-                    reasons.append("接近壓力位")
-                    score += 1
-
-            if not reasons:
-                continue
+        for (score, _), i in top:
+            stock = stocks[i]
+            reasons = [reason(stock) for mask, _, reason in rules if mask[i]]
 
             candidates.append(
                 {
@@ -177,37 +355,43 @@ class PreMarketV3Analyzer:
                 }
             )
 
-        candidates.sort(key=lambda x: (x["score"], abs(x.get("change_percent", 0))), reverse=True)
-        symbols = {c["symbol"] for c in candidates}
         return candidates, symbols
 
     def _build_event_driven_candidates(self, news_items, universe_data: UniverseData, watchlist_symbols: set):
         if not universe_data or not universe_data.tickers:
             return [], []
 
+        tickers = universe_data.tickers
+        name_to_ticker = universe_data.name_to_ticker
+        ticker_to_name = universe_data.ticker_to_name
+        automaton = self._get_name_automaton(universe_data)
         candidates = {}
         for item in news_items:
-            text = f"{item.title} {item.summary}".lower()
-
-            matched = set()
-            matched.update(_extract_ticker_tokens(item.title, universe_data.tickers))
-
-            normalized_text = _normalize_text(text)
-            for name, ticker in universe_data.name_to_ticker.items():
-                if name and name in normalized_text:
-                    matched.add(ticker)
+            matched = _extract_ticker_tokens(item.title, tickers)
+
+            # Always scan company names: the collector's related_tickers only
+            # tag watchlist symbols, which are excluded below anyway.
+            # Title and summary are scanned separately, without joining them
+            texts = [_normalize_text(part) for part in (item.title, item.summary) if part]
+            if automaton is not None:
+                for text in texts:
+                    matched.update(ticker for _, ticker in automaton.iter(text))
+            else:
+                for name, ticker in name_to_ticker.items():
+                    if name and any(name in text for text in texts):
+                        matched.add(ticker)
 
             for ticker in matched:
                 if ticker in watchlist_symbols:
                     continue
-                if ticker not in universe_data.tickers:
+                if ticker not in tickers:
                     continue
 
                 entry = candidates.setdefault(
                     ticker,
                     {
                         "symbol": ticker,
-                        "name": universe_data.ticker_to_name.get(ticker, ""),
+                        "name": ticker_to_name.get(ticker, ""),
                         "headlines": [],
                         "count": 0,
                     },
@@ -216,8 +400,7 @@ class PreMarketV3Analyzer:
                 if len(entry["headlines"]) < 3:
                     entry["headlines"].append(item.title)
 
-        items = list(candidates.values())
-        items.sort(key=lambda x: x["count"], reverse=True)
+        items = heapq.nlargest(MAX_CANDIDATES, candidates.values(), key=lambda x: x["count"])
         symbols = [i["symbol"] for i in items]
         flattened = [
             {
@@ -230,29 +413,46 @@ class PreMarketV3Analyzer:
         ]
         return flattened, symbols
 
+    def _get_name_automaton(self, universe_data: UniverseData):
+        """
+        Aho-Corasick automaton over the universe's company names, built once
+        per universe. Finds every name in a text in one pass instead of one
+        substring scan per name. None if pyahocorasick is not installed.
+        """
+        if ahocorasick is None:
+            return None
+        if self._name_automaton_universe is not universe_data:
+            automaton = ahocorasick.Automaton()
+            for name, ticker in universe_data.name_to_ticker.items():
+                if name:
+                    automaton.add_word(name, ticker)
+            if len(automaton):
+                automaton.make_automaton()
+            else:
+                automaton = None  # An empty automaton cannot be searched
+            self._name_automaton = automaton
+            self._name_automaton_universe = universe_data
+        return self._name_automaton
+
     def _build_news_digest(self, news_items: list) -> list[dict]:
+        tz_et = self.tz_et
+        tz_taipei = self.tz_taipei
         digest = []
         for item in news_items[:20]:
-            try:
-                dt_et = item.published.astimezone(self.tz_et)
-                dt_tw = item.published.astimezone(self.tz_taipei)
-                digest.append(
-                    {
-                        "source": item.source,
-                        "title": item.title,
-                        "time_et": dt_et.strftime("%H:%M"),
-                        "time_taipei": dt_tw.strftime("%H:%M"),
-                    }
-                )
-            except Exception:
-                digest.append(
-                    {
-                        "source": item.source,
-                        "title": item.title,
-                        "time_et": "",
-                        "time_taipei": "",
-                    }
-                )
+            published = item.published
+            if isinstance(published, datetime):
+                time_et = published.astimezone(tz_et).strftime("%H:%M")
+                time_taipei = published.astimezone(tz_taipei).strftime("%H:%M")
+            else:
+                time_et = time_taipei = ""
+            digest.append(
+                {
+                    "source": item.source,
+                    "title": item.title,
+                    "time_et": time_et,
+                    "time_taipei": time_taipei,
+                }
+            )
         return digest
 
     def _format_market_overview(self, overview) -> dict:
@@ -281,13 +481,25 @@ class PreMarketV3Analyzer:
         return data
 
     def _parse_json(self, text: str) -> dict:
-        match = re.search(r"\{[\s\S]*\}", text)
-        if not match:
+        # Fast path: with structured output the whole response is the object
+        loads = orjson.loads if orjson is not None else json.loads
+        try:
+            result = loads(text)
+        except ValueError:
+            result = None
+        if isinstance(result, dict):
+            return result
+
+        # Decode the first JSON object; raw_decode stops at its closing brace,
+        # so trailing chatter (even with braces) is ignored
+        start = text.find("{")
+        if start < 0:
             return {}
         try:
-            return json.loads(match.group())
+            result, _ = _JSON_DECODER.raw_decode(text, start)
         except Exception:
             return {}
+        return result
 
     def _fallback_sections(self, watchlist_candidates, event_candidates):
         return {
@@ -314,31 +526,55 @@ class PreMarketV3Analyzer:
         }
 
 
-def _near_level(price: float, levels: list, threshold: float = 0.02) -> bool:
-    if not price or not levels:
-        return False
+def _dump_data_pack(data_pack: dict) -> str:
+    """Indented JSON for the prompt; orjson when available, else stdlib json."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data_pack, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+            ).decode()
+        except TypeError:
+            pass  # A type orjson does not handle: let json.dumps decide
+    return json.dumps(data_pack, ensure_ascii=False, indent=2)
+
+
+def _level_array(levels: list) -> np.ndarray:
+    """Finite, non-zero price levels as a float array (others never match)."""
+    values = []
     for level in levels:
         try:
-            lvl = float(level)
+            values.append(float(level))
         except Exception:
             continue
-        if lvl and abs(price - lvl) / lvl <= threshold:
-            return True
-    return False
+    array = np.asarray(values, dtype=np.float64)
+    return array[np.isfinite(array) & (array != 0)]
+
+
+def _near_level(price: float, levels, threshold: float = 0.02) -> bool:
+    """
+    Whether price is within threshold (relative) of any level. levels is a
+    raw list or an array from _level_array; all levels are compared at once.
+    """
+    if not price or levels is None or len(levels) == 0:
+        return False
+    if not isinstance(levels, np.ndarray):
+        levels = _level_array(levels)
+    return bool(np.any(np.abs(price - levels) / levels <= threshold))
 
 
 def _extract_ticker_tokens(text: str, universe: set) -> set:
-    tickers = set()
     if not text:
-        return tickers
-    for token in re.findall(r"\b[A-Z]{1,5}\b", text):
-        if token in universe:
-            tickers.add(token)
-    return tickers
+        return set()
+    return universe.intersection(_TICKER_RE.findall(text))
 
 
 def _normalize_text(text: str) -> str:
-    text = text.lower()
-    text = re.sub(r"[^a-z0-9\s]", " ", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    """
+    Lowercase, replace anything but a-z/0-9 with spaces, collapse spaces.
+
+    Non-ASCII characters (including Unicode whitespace) become "?" when
+    encoded and then spaces, so one C-level translate replaces two regex
+    passes.
+    """
+    ascii_text = text.lower().encode("ascii", "replace").translate(_NORMALIZE_TABLE)
+    return b" ".join(ascii_text.split()).decode("ascii")
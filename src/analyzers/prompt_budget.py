@@ -0,0 +1,25 @@
+"""
+Prompt Budget Module
+Fits prompt inputs into token budgets without a tokenizer round-trip.
+"""
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text at a line boundary so it fits an estimated token budget.
+
+    Estimates ~3 UTF-8 bytes per token: about one token per CJK character
+    and conservative for Latin text (~4 bytes/token), so the budget holds
+    for both instead of a flat character cap.
+    """
+    max_bytes = max_tokens * 3
+    if len(text.encode("utf-8")) <= max_bytes:
+        return text
+
+    used = 0
+    lines = text.splitlines(keepends=True)
+    for i, line in enumerate(lines):
+        used += len(line.encode("utf-8"))
+        if used > max_bytes:
+            return "".join(lines[:i])
+    return text
@@ -2,20 +2,83 @@
 Video Analyzer Module
 Uses Gemini AI to analyze and summarize YouTube videos.
 """
-from google import genai
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
 from google.genai import types
 
+try:
+    import orjson  # Optional: faster response parsing
+except ImportError:
+    orjson = None
+
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.config.settings import (
     GEMINI_API_KEY,
     GEMINI_MODEL,
     GEMINI_TEMPERATURE,
     GEMINI_MAX_OUTPUT_TOKENS,
+    VIDEO_CACHE_TTL_HOURS,
+    VIDEO_BATCH_TRANSCRIPT_CHARS,
 )
+from src.analyzers.gemini_client import get_client, generate_with_retry
+from src.analyzers.llm_cache import ResponseCache
 from src.collectors.youtube import YouTubeVideo
+from src.prompts import build_prompt
+
+# Sections requested for every video, single or batched
+_VIDEO_ANALYSIS_RUBRIC = """### 核心觀點（50-100字）
+這部影片的主要論點是什麼？
+
+### 關鍵要點（3-5點，每點一句話）
+-
+
+### 提及的投資標的
+列出影片中提及的股票/ETF及觀點（看漲/看跌/中性）
+
+### 市場判斷
+創作者對近期市場的整體看法（一句話）
+"""
+
+_VIDEO_BATCH_PROMPT = """分析下方依序列出的 YouTube 財經影片（## 影片 1、## 影片 2 …），逐一提供簡潔摘要。
+
+## 每部影片請提供（繁體中文，簡潔扼要）：
+
+""" + _VIDEO_ANALYSIS_RUBRIC + """
+## 輸出格式
+
+輸出 JSON 陣列，每部影片一個元素，順序與輸入相同：
+- index：影片編號（與輸入的「影片 N」相同）
+- analysis：該影片的完整摘要（Markdown，包含上述 4 個小節）
+"""
+
+_VIDEO_BATCH_ITEM_INPUT = """## 影片 {index}
+- 標題: {title}
+- 頻道: {channel}
+- 時長: {duration}
+
+### 字幕內容
+{transcript}
+"""
+
+# Structured output for analyze_videos_batch: one analysis per input video
+VIDEO_BATCH_RESPONSE_SCHEMA = types.Schema(
+    type=types.Type.ARRAY,
+    items=types.Schema(
+        type=types.Type.OBJECT,
+        properties={
+            "index": types.Schema(type=types.Type.INTEGER),
+            "analysis": types.Schema(type=types.Type.STRING),
+        },
+        required=["index", "analysis"],
+    ),
+)
 
 
 class VideoAnalyzer:
@@ -25,12 +88,18 @@ class VideoAnalyzer:
         if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not set in environment")
 
-        self.client = genai.Client(api_key=GEMINI_API_KEY)
+        self.client = get_client()
         self.model = GEMINI_MODEL
         self.generation_config = types.GenerateContentConfig(
             temperature=GEMINI_TEMPERATURE,
             max_output_tokens=GEMINI_MAX_OUTPUT_TOKENS,
         )
+        self.video_config = types.GenerateContentConfig(
+            temperature=0.2,
+            max_output_tokens=1500,
+        )
+        # Re-analyzing a video seen in an earlier run reuses its analysis
+        self.cache = ResponseCache(ttl_hours=VIDEO_CACHE_TTL_HOURS)
 
     def analyze_video(self, video: YouTubeVideo) -> dict:
         """Analyze a single video and generate summary."""
@@ -54,48 +123,112 @@ class VideoAnalyzer:
 
 ## 請提供（繁體中文，簡潔扼要）：
 
-### 核心觀點（50-100字）
-這部影片的主要論點是什麼？
+{_VIDEO_ANALYSIS_RUBRIC}"""
 
-### 關鍵要點（3-5點，每點一句話）
--
-
-### 提及的投資標的
-列出影片中提及的股票/ETF及觀點（看漲/看跌/中性）
-
-### 市場判斷
-創作者對近期市場的整體看法（一句話）
-"""
+        key = self.cache.make_key(
+            model=self.model,
+            prompt=prompt,
+            temperature=self.video_config.temperature,
+            max_output_tokens=self.video_config.max_output_tokens,
+        )
 
         try:
-            response = self.client.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=0.2,
-                    max_output_tokens=1500,
-                ),
-            )
-
-            return {
-                "video_id": video.video_id,
-                "title": video.title,
-                "channel": video.channel_name,
-                "url": video.url,
-                "duration": video.duration,
-                "analysis": response.text,
-            }
+            analysis_text = self.cache.get(key)
+            if analysis_text is None:
+                response = generate_with_retry(
+                    self.client,
+                    model=self.model,
+                    contents=prompt,
+                    config=self.video_config,
+                )
+                analysis_text = response.text
+                self.cache.put(key, analysis_text)
+
+            return self._video_result(video, analysis_text)
 
         except Exception as e:
             print(f"Error analyzing video {video.title}: {e}")
-            return {
-                "video_id": video.video_id,
-                "title": video.title,
-                "channel": video.channel_name,
-                "url": video.url,
-                "duration": video.duration,
-                "analysis": f"分析時發生錯誤: {e}",
+            return self._video_result(video, f"分析時發生錯誤: {e}")
+
+    def analyze_videos_batch(self, videos: list[YouTubeVideo]) -> list[dict]:
+        """
+        Analyze several videos (all with transcripts) in one request.
+
+        Each video sends its first VIDEO_BATCH_TRANSCRIPT_CHARS transcript
+        characters. Returns one analyze_video-style result per video, in
+        input order; videos missing from the reply are analyzed singly.
+        """
+        if not videos:
+            return []
+
+        prompt = build_prompt(
+            _VIDEO_BATCH_PROMPT,
+            "\n".join(
+                _VIDEO_BATCH_ITEM_INPUT.format(
+                    index=index,
+                    title=video.title,
+                    channel=video.channel_name,
+                    duration=video.duration,
+                    transcript=video.transcript[:VIDEO_BATCH_TRANSCRIPT_CHARS],
+                )
+                for index, video in enumerate(videos, 1)
+            ),
+        )
+        # Same per-video output budget as a single analysis
+        config = types.GenerateContentConfig(
+            temperature=self.video_config.temperature,
+            max_output_tokens=self.video_config.max_output_tokens * len(videos),
+            response_mime_type="application/json",
+            response_schema=VIDEO_BATCH_RESPONSE_SCHEMA,
+        )
+        key = self.cache.make_key(
+            model=self.model,
+            prompt=prompt,
+            temperature=config.temperature,
+            max_output_tokens=config.max_output_tokens,
+            response_mime_type=config.response_mime_type,
+            response_schema=VIDEO_BATCH_RESPONSE_SCHEMA.model_dump(mode="json", exclude_none=True),
+        )
+
+        analyses = {}
+        try:
+            text = self.cache.get(key)
+            cached = text is not None
+            if not cached:
+                response = generate_with_retry(
+                    self.client,
+                    model=self.model,
+                    contents=prompt,
+                    config=config,
+                )
+                text = response.text
+
+            analyses = {
+                item["index"]: item["analysis"]
+                for item in (orjson.loads if orjson is not None else json.loads)(text)
+                if item.get("analysis")
             }
+            # Only a reply that parses is cached: a truncated one would force
+            # the single-video fallbacks on every run until it expired
+            if not cached:
+                self.cache.put(key, text)
+        except Exception as e:
+            print(f"Error analyzing batch of {len(videos)} videos, falling back to single requests: {e}")
+
+        return [
+            self._video_result(video, analyses[index]) if index in analyses else self.analyze_video(video)
+            for index, video in enumerate(videos, 1)
+        ]
+
+    def _video_result(self, video: YouTubeVideo, analysis: str) -> dict:
+        return {
+            "video_id": video.video_id,
+            "title": video.title,
+            "channel": video.channel_name,
+            "url": video.url,
+            "duration": video.duration,
+            "analysis": analysis,
+        }
 
     def generate_video_summaries(self, videos: list[YouTubeVideo], collector) -> str:
         """Generate summaries for videos with transcripts."""
@@ -105,12 +238,9 @@ class VideoAnalyzer:
         lines = ["## 📺 YouTube 財經頻道更新\n"]
 
         # Group by category
-        by_category = {}
+        by_category = defaultdict(list)
         for video in videos:
-            cat = video.category or "其他"
-            if cat not in by_category:
-                by_category[cat] = []
-            by_category[cat].append(video)
+            by_category[video.category or "其他"].append(video)
 
         category_names = {
             "us_stocks": "美股財經",
@@ -122,10 +252,20 @@ class VideoAnalyzer:
             "financial_media": "財經媒體",
         }
 
-        analyzed_count = 0
+        # Known categories in a fixed order, then any others as first seen,
+        # so the same videos give the same report (and prompts) every run
+        categories = [cat for cat in category_names if cat in by_category]
+        categories += [cat for cat in by_category if cat not in category_names]
+
         max_analyze = 5  # Limit API calls
+        analyses = self._analyze_first_with_transcripts(
+            [video for category in categories for video in by_category[category]],
+            collector,
+            max_analyze,
+        )
 
-        for category, cat_videos in by_category.items():
+        for category in categories:
+            cat_videos = by_category[category]
             cat_name = category_names.get(category, category)
             lines.append(f"\n### {cat_name}\n")
 
@@ -133,22 +273,49 @@ class VideoAnalyzer:
                 lines.append(f"#### [{video.channel_name}] {video.title}")
                 lines.append(f"🔗 [觀看影片]({video.url}) | ⏱️ {video.duration}\n")
 
-                # Get transcript and analyze (limited)
-                if analyzed_count < max_analyze:
-                    video.transcript = collector.get_transcript(video.video_id)
-                    if video.transcript:
-                        analysis = self.analyze_video(video)
-                        lines.append(analysis.get("analysis", "無法生成摘要"))
-                        analyzed_count += 1
-                    else:
-                        lines.append("*（無字幕，無法生成摘要）*")
-                else:
+                if video.video_id not in analyses:
                     lines.append("*（待分析）*")
+                elif analyses[video.video_id] is None:
+                    lines.append("*（無字幕，無法生成摘要）*")
+                else:
+                    lines.append(analyses[video.video_id])
 
                 lines.append("")  # Empty line between videos
 
         return "\n".join(lines)
 
+    def _analyze_first_with_transcripts(self, videos: list[YouTubeVideo], collector, limit: int) -> dict:
+        """
+        Fetch transcripts and analyze the first `limit` videos that have one.
+
+        Transcripts are fetched in a thread pool, then every video with a
+        transcript is analyzed in one batched request. Returns video_id ->
+        analysis text, or None for a video without a transcript. Videos
+        past the limit are not fetched and are left out.
+        """
+        results = {}
+        to_analyze = []
+        remaining = list(videos)
+
+        with ThreadPoolExecutor(max_workers=limit) as pool:
+            # Fetch only as many transcripts as analyses are still needed,
+            # so the same videos are tried as in a one-by-one pass
+            while remaining and len(to_analyze) < limit:
+                batch = remaining[:limit - len(to_analyze)]
+                remaining = remaining[len(batch):]
+                transcripts = pool.map(lambda video: collector.get_transcript(video.video_id), batch)
+                for video, transcript in zip(batch, transcripts):
+                    video.transcript = transcript
+                    if transcript:
+                        to_analyze.append(video)
+                    else:
+                        results[video.video_id] = None
+
+        for analysis in self.analyze_videos_batch(to_analyze):
+            results[analysis["video_id"]] = analysis.get("analysis", "無法生成摘要")
+
+        return results
+
     def generate_quick_list(self, videos: list[YouTubeVideo]) -> str:
         """Generate a quick list of new videos without full analysis."""
         if not videos:
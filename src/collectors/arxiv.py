@@ -2,23 +2,30 @@
 arXiv Collector Module
 Fetches AI/ML research papers from arXiv.
 """
-import feedparser
-import requests
+import io
+import xml.etree.ElementTree as ET
 from datetime import datetime, timedelta
 from typing import Optional
+import numpy as np
 import pytz
 import re
 import time
+from collections import Counter
+from functools import lru_cache
 from urllib.parse import quote
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.collectors.base import IntelItem, SourceType, BaseCollector
+from src.collectors.base import IntelItem, SourceType, BaseCollector, build_keyword_automaton
 from src.config.settings import TIMEZONE
 
 
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+
 # Important arXiv categories for AI/ML
 ARXIV_CATEGORIES = {
     "cs.AI": "Artificial Intelligence",
@@ -70,6 +77,67 @@ AI_AFFILIATIONS = {
 }
 
 
+# Relevance bonuses: +3 per major lab among a paper's affiliations, +1 per
+# primary category it is listed under
+MAJOR_LAB_KEYS = frozenset({"google", "openai", "anthropic", "meta", "microsoft", "nvidia"})
+PRIMARY_CATEGORIES = frozenset({"cs.AI", "cs.LG", "cs.CL"})
+
+# Lowercased words, with runs of CJK (or other non-ASCII) characters kept whole
+_WORD_RE = re.compile(r"[a-z0-9]+|[^\x00-\x7f]+")
+
+
+def _affiliation_text(text: str) -> str:
+    """Lowercased words of text joined by single spaces, padded with a space at each end."""
+    return f" {' '.join(_WORD_RE.findall(text.lower()))} "
+
+
+def _affiliation_pattern(name: str) -> str:
+    """
+    Lab name as searched for in _affiliation_text.
+
+    ASCII names are normalized the same way, so they only match whole words
+    ("MIT" must not fire on "submit"); CJK names have no word boundaries and
+    match as substrings ("清華" in "清華大學").
+    """
+    return _affiliation_text(name) if name.isascii() else name.lower()
+
+
+# Lab names that are also ordinary words ("meta-learning", "a fair
+# comparison"): matched only in the author list, with their exact case
+AMBIGUOUS_AFFILIATIONS = frozenset({"Meta", "FAIR"})
+_AMBIGUOUS_AFFILIATION_RE = re.compile(
+    r"\b(" + "|".join(re.escape(name) for name in AMBIGUOUS_AFFILIATIONS) + r")\b"
+)
+
+# Every keyword -> its score (2 per listing; a keyword listed twice, like
+# "alignment", counts twice), and every other lab name pattern -> lab key
+_KEYWORD_POINTS = {
+    keyword.lower(): 2 * count for keyword, count in Counter(HIGH_SIGNAL_KEYWORDS).items()
+}
+_AFFILIATION_PATTERNS = {
+    _affiliation_pattern(name): lab_key
+    for lab_key, lab_names in AI_AFFILIATIONS.items()
+    for name in lab_names
+    if name not in AMBIGUOUS_AFFILIATIONS
+}
+_AMBIGUOUS_LAB_KEYS = {
+    name: lab_key
+    for lab_key, lab_names in AI_AFFILIATIONS.items()
+    for name in lab_names
+    if name in AMBIGUOUS_AFFILIATIONS
+}
+_AFFILIATION_AUTOMATON = build_keyword_automaton(_AFFILIATION_PATTERNS)
+_KEYWORD_AUTOMATON = build_keyword_automaton(
+    {keyword: (keyword, points) for keyword, points in _KEYWORD_POINTS.items()}
+)
+
+
+@lru_cache(maxsize=32)
+def _category_query(categories: tuple) -> str:
+    """arXiv search_query clause matching any of categories, e.g. "cat:cs.AI OR cat:cs.LG"."""
+    return " OR ".join([f"cat:{cat}" for cat in categories])
+
+
 class ArxivCollector(BaseCollector):
     """
     Collects AI/ML research papers from arXiv.
@@ -82,6 +150,10 @@ class ArxivCollector(BaseCollector):
     """
 
     BASE_URL = "http://export.arxiv.org/api/query"
+    REQUEST_INTERVAL = 3.0  # arXiv API policy: at most one request every 3 seconds
+
+    # Shared by all instances, so the spacing holds across a whole session
+    _last_request = 0.0
 
     def __init__(self):
         super().__init__()
@@ -104,21 +176,32 @@ class ArxivCollector(BaseCollector):
         Returns:
             List of IntelItem objects
         """
+        items, _ = self._collect_recent_scored(categories, max_results, days_lookback)
+        return items
+
+    def _collect_recent_scored(
+        self,
+        categories: list,
+        max_results: int,
+        days_lookback: int,
+    ) -> tuple[list[IntelItem], np.ndarray]:
+        """Recent papers newest first (then by relevance), with their relevance scores."""
         if categories is None:
             categories = ["cs.AI", "cs.LG", "cs.CL", "cs.CV"]
 
         cutoff_time = datetime.now(self.tz) - timedelta(days=days_lookback)
 
         # Build category query
-        cat_query = " OR ".join([f"cat:{cat}" for cat in categories])
-        query = f"({cat_query})"
+        query = f"({_category_query(tuple(categories))})"
 
         items = self._fetch_papers(query, max_results, cutoff_time)
 
-        # Sort by date and relevance score
-        items.sort(key=lambda x: (x.published, self._relevance_score(x)), reverse=True)
+        # Sort by date and relevance score, each paper scored once
+        scores = self._relevance_scores(items)
+        published = np.fromiter((x.published.timestamp() for x in items), dtype=np.float64, count=len(items))
+        order = np.lexsort((-scores, -published))
 
-        return items
+        return [items[i] for i in order], scores[order]
 
     def search_papers(
         self,
@@ -145,17 +228,16 @@ class ArxivCollector(BaseCollector):
         keyword_query = " OR ".join([f'all:"{kw}"' for kw in keywords])
 
         if categories:
-            cat_query = " OR ".join([f"cat:{cat}" for cat in categories])
-            query = f"({keyword_query}) AND ({cat_query})"
+            query = f"({keyword_query}) AND ({_category_query(tuple(categories))})"
         else:
             query = keyword_query
 
         items = self._fetch_papers(query, max_results, cutoff_time)
 
         # Sort by relevance
-        items.sort(key=lambda x: self._relevance_score(x), reverse=True)
+        order = np.argsort(-self._relevance_scores(items), kind="stable")
 
-        return items
+        return [items[i] for i in order]
 
     def collect_high_signal_papers(
         self,
@@ -169,23 +251,17 @@ class ArxivCollector(BaseCollector):
             List of high-signal IntelItem objects
         """
         # Get recent papers from main categories
-        all_papers = self.collect_recent_papers(
+        all_papers, scores = self._collect_recent_scored(
             categories=["cs.AI", "cs.LG", "cs.CL"],
             max_results=max_results * 2,
             days_lookback=days_lookback,
         )
 
-        # Filter and score
-        scored_papers = []
-        for paper in all_papers:
-            score = self._relevance_score(paper)
-            if score > 0:
-                scored_papers.append((score, paper))
-
-        # Sort by score and return top papers
-        scored_papers.sort(key=lambda x: x[0], reverse=True)
+        # Keep scored papers, sort by score and return top papers
+        scored = np.flatnonzero(scores > 0)
+        top = scored[np.argsort(-scores[scored], kind="stable")][:max_results]
 
-        return [paper for score, paper in scored_papers[:max_results]]
+        return [all_papers[i] for i in top]
 
     def _fetch_papers(
         self,
@@ -205,16 +281,15 @@ class ArxivCollector(BaseCollector):
         }
 
         try:
-            response = requests.get(
+            self._wait_for_slot()
+            response = self._http.get(
                 self.BASE_URL,
                 params=params,
                 timeout=30
             )
             response.raise_for_status()
 
-            feed = feedparser.parse(response.text)
-
-            for entry in feed.entries:
+            for entry in self._iter_entries(response.content):
                 try:
                     item = self._parse_entry(entry, cutoff_time)
                     if item:
@@ -222,23 +297,62 @@ class ArxivCollector(BaseCollector):
                 except Exception as e:
                     continue
 
-            time.sleep(3)  # arXiv rate limiting (3 seconds between requests)
-
         except Exception as e:
             print(f"Error fetching arXiv papers: {e}")
 
         return items
 
+    def _iter_entries(self, content: bytes):
+        """
+        Yield each Atom <entry> of an arXiv response as a dict with the
+        fields _parse_entry reads (feedparser's key names).
+
+        Entries are parsed incrementally and detached from the feed once
+        read, so the parsed tree stays bounded regardless of max_results.
+        """
+        feed = None
+        for event, elem in ET.iterparse(io.BytesIO(content), events=("start", "end")):
+            if feed is None:
+                feed = elem
+            if event != "end" or elem.tag != f"{ATOM_NS}entry":
+                continue
+
+            entry = {
+                "id": elem.findtext(f"{ATOM_NS}id", ""),
+                "title": elem.findtext(f"{ATOM_NS}title", ""),
+                "summary": elem.findtext(f"{ATOM_NS}summary", ""),
+                "published": elem.findtext(f"{ATOM_NS}published", ""),
+                "updated": elem.findtext(f"{ATOM_NS}updated", ""),
+                "authors": [{"name": a.findtext(f"{ATOM_NS}name", "")} for a in elem.iterfind(f"{ATOM_NS}author")],
+                "tags": [{"term": c.get("term", "")} for c in elem.iterfind(f"{ATOM_NS}category")],
+            }
+            # Like feedparser, fall back to the id (the abstract URL) without an alternate link
+            entry["link"] = next(
+                (link.get("href") for link in elem.iterfind(f"{ATOM_NS}link") if link.get("rel", "alternate") == "alternate"),
+                entry["id"],
+            )
+
+            feed.remove(elem)
+            yield entry
+
+    def _wait_for_slot(self):
+        """Sleep only as long as needed to keep REQUEST_INTERVAL since the previous request."""
+        wait = ArxivCollector._last_request + self.REQUEST_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        ArxivCollector._last_request = time.monotonic()
+
     def _parse_entry(
         self,
         entry,
         cutoff_time: datetime,
     ) -> Optional[IntelItem]:
         """Parse a single arXiv entry."""
-        # Parse date
+        # Parse date; only papers past the cutoff are converted to local time
         published = self._parse_date(entry)
         if published and published < cutoff_time:
             return None
+        published = published.astimezone(self.tz) if published else datetime.now(self.tz)
 
         # Extract arxiv ID
         arxiv_id = entry.get("id", "").split("/abs/")[-1]
@@ -270,7 +384,7 @@ class ArxivCollector(BaseCollector):
             source="arXiv",
             source_type=SourceType.RESEARCH_PAPER,
             url=entry.get("link", f"https://arxiv.org/abs/{arxiv_id}"),
-            published=published or datetime.now(self.tz),
+            published=published,
             summary=abstract[:500] + "..." if len(abstract) > 500 else abstract,
             full_text=abstract,
             category=", ".join(categories[:3]),
@@ -290,67 +404,50 @@ class ArxivCollector(BaseCollector):
         return item
 
     def _parse_date(self, entry) -> Optional[datetime]:
-        """Parse date from entry."""
-        # Try published date first
-        published_str = entry.get("published", "")
-        if published_str:
-            try:
-                # arXiv format: 2024-01-15T12:00:00Z
-                dt = datetime.fromisoformat(published_str.replace("Z", "+00:00"))
-                return dt.astimezone(self.tz)
-            except Exception:
-                pass
-
-        # Try updated date
-        updated_str = entry.get("updated", "")
-        if updated_str:
-            try:
-                dt = datetime.fromisoformat(updated_str.replace("Z", "+00:00"))
-                return dt.astimezone(self.tz)
-            except Exception:
-                pass
+        """Parse date from entry (timezone-aware, as given: arXiv uses UTC)."""
+        # Try published date first, then updated date
+        for key in ("published", "updated"):
+            date_str = entry.get(key, "")
+            if date_str:
+                try:
+                    # arXiv format: 2024-01-15T12:00:00Z
+                    return datetime.fromisoformat(date_str.replace("Z", "+00:00"))
+                except Exception:
+                    pass
 
         return None
 
     def _detect_affiliations(self, authors: list, abstract: str) -> list:
         """Detect research lab affiliations from author names and abstract."""
-        affiliations = set()
-        text = " ".join(authors) + " " + abstract
-
-        for lab_key, lab_names in AI_AFFILIATIONS.items():
-            for name in lab_names:
-                if name.lower() in text.lower():
-                    affiliations.add(lab_key)
-                    break
+        author_text = " ".join(authors)
+        text = _affiliation_text(author_text + " " + abstract)
+        if _AFFILIATION_AUTOMATON is not None:
+            affiliations = {lab_key for _, lab_key in _AFFILIATION_AUTOMATON.iter(text)}
+        else:
+            affiliations = {lab_key for pattern, lab_key in _AFFILIATION_PATTERNS.items() if pattern in text}
 
+        affiliations.update(_AMBIGUOUS_LAB_KEYS[name] for name in _AMBIGUOUS_AFFILIATION_RE.findall(author_text))
         return list(affiliations)
 
+    def _relevance_scores(self, items: list[IntelItem]) -> np.ndarray:
+        return np.fromiter((self._relevance_score(x) for x in items), dtype=np.int32, count=len(items))
+
     def _relevance_score(self, item: IntelItem) -> int:
         """
         Calculate relevance score for a paper.
         Higher score = more likely to be high-signal.
         """
-        score = 0
-        text = f"{item.title} {item.summary}".lower()
+        text = item.search_text
 
         # Check for high-signal keywords
-        for keyword in HIGH_SIGNAL_KEYWORDS:
-            if keyword.lower() in text:
-                score += 2
-
-        # Bonus for major lab affiliations
-        affiliations = item.metadata.get("affiliations", [])
-        major_labs = ["google", "openai", "anthropic", "meta", "microsoft", "nvidia"]
-        for lab in major_labs:
-            if lab in affiliations:
-                score += 3
-
-        # Bonus for being in primary categories
-        categories = item.metadata.get("categories", [])
-        primary_cats = ["cs.AI", "cs.LG", "cs.CL"]
-        for cat in primary_cats:
-            if cat in categories:
-                score += 1
+        if _KEYWORD_AUTOMATON is not None:
+            score = sum(points for _, points in {match for _, match in _KEYWORD_AUTOMATON.iter(text)})
+        else:
+            score = sum(points for keyword, points in _KEYWORD_POINTS.items() if keyword in text)
+
+        # Bonus for major lab affiliations and primary categories
+        score += 3 * len(MAJOR_LAB_KEYS.intersection(item.metadata.get("affiliations", [])))
+        score += len(PRIMARY_CATEGORIES.intersection(item.metadata.get("categories", [])))
 
         return score
 
@@ -1,11 +1,19 @@
 """
 Base classes and data structures for collectors.
 """
+import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Optional
 from enum import Enum
 
+import requests
+
+try:
+    import ahocorasick  # Optional (pyahocorasick): one-pass multi-keyword matching
+except ImportError:
+    ahocorasick = None
+
 
 class SourceType(Enum):
     """資料來源類型"""
@@ -32,7 +40,7 @@ class SignalType(Enum):
     NOISE = "noise"                 # 噪音或重複資訊
 
 
-@dataclass
+@dataclass(slots=True)
 class IntelItem:
     """
     統一情報資料結構
@@ -109,6 +117,32 @@ class IntelItem:
     }
     """
 
+    # === 衍生字串快取（slots 無 __dict__，無法用 cached_property）===
+    _display_date: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _ticker_prefix_str: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _search_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def display_date(self) -> str:
+        """Short publish date used in prompts, e.g. "01/15"."""
+        if self._display_date is None:
+            self._display_date = self.published.strftime("%m/%d")
+        return self._display_date
+
+    @property
+    def ticker_prefix_str(self) -> str:
+        """Up to three related tickers formatted as "$NVDA, $MSFT"."""
+        if self._ticker_prefix_str is None:
+            self._ticker_prefix_str = ", ".join([f"${t}" for t in self.related_tickers[:3]])
+        return self._ticker_prefix_str
+
+    @property
+    def search_text(self) -> str:
+        """Lowercased "title summary", shared by keyword scoring and entity tagging."""
+        if self._search_text is None:
+            self._search_text = f"{self.title} {self.summary}".lower()
+        return self._search_text
+
     def to_dict(self) -> dict:
         """Convert to dictionary for serialization."""
         return {
@@ -151,9 +185,40 @@ class IntelItem:
         )
 
 
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+
+
+def normalize_title(title: str) -> str:
+    """Lowercase a title and strip punctuation / extra whitespace for duplicate checks."""
+    return " ".join(_PUNCTUATION_RE.sub("", title.lower()).split())
+
+
+def build_keyword_automaton(words: dict):
+    """
+    Aho-Corasick automaton mapping each lowercased word to its value.
+
+    Finds every word in a (lowercased) text in one pass instead of one
+    substring scan per word. None if pyahocorasick is not installed or
+    words is empty; callers then fall back to substring checks.
+    """
+    if ahocorasick is None or not words:
+        return None
+    automaton = ahocorasick.Automaton()
+    for word, value in words.items():
+        automaton.add_word(word.lower(), value)
+    automaton.make_automaton()
+    return automaton
+
+
 class BaseCollector:
     """Base class for all collectors."""
 
+    # Shared by all collectors: keeps connections alive between requests to
+    # the same host instead of a new TCP + TLS handshake per call. requests
+    # already sends Accept-Encoding: gzip, deflate (and br when brotli is
+    # installed) and decodes the response transparently.
+    _http = requests.Session()
+
     def __init__(self):
         self.entity_matcher = None  # Will be initialized when needed
 
@@ -169,9 +234,10 @@ class BaseCollector:
         matcher = self._load_entity_matcher()
         text = f"{item.title} {item.summary}"
 
-        tickers, entities, industries = matcher.find_matches(text)
+        tickers, entities, industries = matcher.find_matches(text, text_lower=item.search_text)
 
         item.related_tickers = list(set(item.related_tickers + tickers))
+        item._ticker_prefix_str = None  # Invalidate cached display string
         item.related_entities = list(set(item.related_entities + entities))
         item.industries = list(set(item.industries + industries))
 
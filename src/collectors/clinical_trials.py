@@ -2,7 +2,6 @@
 ClinicalTrials.gov Collector Module
 Fetches clinical trial updates from ClinicalTrials.gov API.
 """
-import requests
 from datetime import datetime, timedelta
 from typing import Optional
 import pytz
@@ -10,9 +9,11 @@ import time
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from src.collectors.base import IntelItem, SourceType, BaseCollector
+from src.collectors.base import IntelItem, SourceType, BaseCollector, build_keyword_automaton
 from src.config.settings import TIMEZONE
 
 
@@ -52,6 +53,11 @@ THERAPEUTIC_AREAS = {
     "gene_therapy": ["gene therapy", "CRISPR", "CAR-T", "cell therapy"],
 }
 
+# Every therapeutic-area keyword -> its area
+_AREA_AUTOMATON = build_keyword_automaton(
+    {keyword: area for area, keywords in THERAPEUTIC_AREAS.items() for keyword in keywords}
+)
+
 # Trial phases and their significance
 PHASE_PRIORITY = {
     "PHASE3": 5,      # Most important - near approval
@@ -248,7 +254,7 @@ class ClinicalTrialsCollector(BaseCollector):
         }
 
         try:
-            response = requests.get(
+            response = self._http.get(
                 self.BASE_URL,
                 params=params,
                 timeout=30
@@ -372,9 +378,11 @@ class ClinicalTrialsCollector(BaseCollector):
         summary: str,
     ) -> list:
         """Detect therapeutic areas from trial information."""
-        areas = set()
         text = " ".join(conditions + [title, summary]).lower()
+        if _AREA_AUTOMATON is not None:
+            return list({area for _, area in _AREA_AUTOMATON.iter(text)})
 
+        areas = set()
         for area, keywords in THERAPEUTIC_AREAS.items():
             for keyword in keywords:
                 if keyword.lower() in text:
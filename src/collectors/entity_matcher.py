@@ -137,10 +137,14 @@ class EntityMatcher:
         else:
             self.ticker_pattern = None
 
-    def find_matches(self, text: str) -> Tuple[list, list, list]:
+    def find_matches(self, text: str, text_lower: str = None) -> Tuple[list, list, list]:
         """
         Find all matching entities in text.
 
+        Args:
+            text: Text to search
+            text_lower: text.lower(), if the caller already has it
+
         Returns:
             Tuple of (tickers, entities, industries)
             - tickers: list of matched stock tickers
@@ -154,7 +158,8 @@ class EntityMatcher:
         if not text:
             return [], [], []
 
-        text_lower = text.lower()
+        if text_lower is None:
+            text_lower = text.lower()
 
         # Match tickers directly
         if self.ticker_pattern:
@@ -3,7 +3,6 @@ FDA Collector Module
 Fetches FDA approvals, warning letters, and regulatory updates.
 """
 import feedparser
-import requests
 from datetime import datetime, timedelta
 from typing import Optional
 import pytz
@@ -12,7 +11,9 @@ import time
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.collectors.base import IntelItem, SourceType, BaseCollector
 from src.config.settings import TIMEZONE
@@ -126,7 +127,7 @@ class FDACollector(BaseCollector):
                 "limit": max_results,
             }
 
-            response = requests.get(
+            response = self._http.get(
                 f"{OPENFDA_BASE}{OPENFDA_ENDPOINTS['drug_approvals']}",
                 params=params,
                 timeout=30
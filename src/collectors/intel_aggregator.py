@@ -2,13 +2,16 @@
 Intel Aggregator Module
 Aggregates data from all collectors into a unified intelligence feed.
 """
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 import pytz
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.collectors.base import IntelItem, SourceType
 from src.collectors.news import NewsCollector, NewsItem
@@ -65,70 +68,88 @@ class IntelAggregator:
         all_items = []
         hours_lookback = days_lookback * 24
 
-        # 1. News
-        if include_news:
-            print("📰 Collecting news...")
-            try:
-                news_items = self.news_collector.collect_all()
-                intel_items = self._convert_news_items(news_items)
-                all_items.extend(intel_items)
-                print(f"   Found {len(intel_items)} news items")
-            except Exception as e:
-                print(f"   ⚠️ News collection error: {e}")
-
-        # 2. SEC EDGAR
-        if include_sec:
-            print("📋 Collecting SEC filings...")
-            try:
-                sec_items = self.sec_collector.collect_recent_filings(
+        # Sources are independent and network-bound: fetch them all at
+        # once, then report and merge them in the usual order
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            if include_news:
+                news_future = pool.submit(self.news_collector.collect_all)
+            if include_sec:
+                sec_future = pool.submit(
+                    self.sec_collector.collect_recent_filings,
                     form_types=["8-K", "10-Q"],
                     hours_lookback=hours_lookback,
                     max_per_type=50
                 )
-                all_items.extend(sec_items)
-                print(f"   Found {len(sec_items)} SEC filings")
-            except Exception as e:
-                print(f"   ⚠️ SEC collection error: {e}")
-
-        # 3. arXiv
-        if include_arxiv:
-            print("📄 Collecting arXiv papers...")
-            try:
-                arxiv_items = self.arxiv_collector.collect_high_signal_papers(
+            if include_arxiv:
+                arxiv_future = pool.submit(
+                    self.arxiv_collector.collect_high_signal_papers,
                     max_results=30,
                     days_lookback=days_lookback
                 )
-                all_items.extend(arxiv_items)
-                print(f"   Found {len(arxiv_items)} high-signal papers")
-            except Exception as e:
-                print(f"   ⚠️ arXiv collection error: {e}")
-
-        # 4. Clinical Trials
-        if include_trials:
-            print("💊 Collecting clinical trials...")
-            try:
-                trial_items = self.trials_collector.collect_recent_updates(
+            if include_trials:
+                trials_future = pool.submit(
+                    self.trials_collector.collect_recent_updates,
                     phases=["PHASE2", "PHASE3"],
                     days_lookback=days_lookback,
                     max_results=30
                 )
-                all_items.extend(trial_items)
-                print(f"   Found {len(trial_items)} trial updates")
-            except Exception as e:
-                print(f"   ⚠️ Clinical trials collection error: {e}")
-
-        # 5. FDA
-        if include_fda:
-            print("🏥 Collecting FDA updates...")
-            try:
-                fda_items = self.fda_collector.collect_all(
+            if include_fda:
+                fda_future = pool.submit(
+                    self.fda_collector.collect_all,
                     days_lookback=days_lookback,
                     max_results=30
                 )
-                all_items.extend(fda_items)
-                print(f"   Found {len(fda_items)} FDA updates")
-            except Exception as e:
-                print(f"   ⚠️ FDA collection error: {e}")
+
+            # 1. News
+            if include_news:
+                print("📰 Collecting news...")
+                try:
+                    news_items = news_future.result()
+                    intel_items = self._convert_news_items(news_items)
+                    all_items.extend(intel_items)
+                    print(f"   Found {len(intel_items)} news items")
+                except Exception as e:
+                    print(f"   ⚠️ News collection error: {e}")
+
+            # 2. SEC EDGAR
+            if include_sec:
+                print("📋 Collecting SEC filings...")
+                try:
+                    sec_items = sec_future.result()
+                    all_items.extend(sec_items)
+                    print(f"   Found {len(sec_items)} SEC filings")
+                except Exception as e:
+                    print(f"   ⚠️ SEC collection error: {e}")
+
+            # 3. arXiv
+            if include_arxiv:
+                print("📄 Collecting arXiv papers...")
+                try:
+                    arxiv_items = arxiv_future.result()
+                    all_items.extend(arxiv_items)
+                    print(f"   Found {len(arxiv_items)} high-signal papers")
+                except Exception as e:
+                    print(f"   ⚠️ arXiv collection error: {e}")
+
+            # 4. Clinical Trials
+            if include_trials:
+                print("💊 Collecting clinical trials...")
+                try:
+                    trial_items = trials_future.result()
+                    all_items.extend(trial_items)
+                    print(f"   Found {len(trial_items)} trial updates")
+                except Exception as e:
+                    print(f"   ⚠️ Clinical trials collection error: {e}")
+
+            # 5. FDA
+            if include_fda:
+                print("🏥 Collecting FDA updates...")
+                try:
+                    fda_items = fda_future.result()
+                    all_items.extend(fda_items)
+                    print(f"   Found {len(fda_items)} FDA updates")
+                except Exception as e:
+                    print(f"   ⚠️ FDA collection error: {e}")
 
         # Sort by date (newest first)
         all_items.sort(key=lambda x: x.published, reverse=True)
@@ -12,7 +12,9 @@ import time
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.collectors.base import IntelItem, SourceType, BaseCollector
 from src.config.settings import TIMEZONE
@@ -232,7 +234,9 @@ class SECEdgarCollector(BaseCollector):
         items = []
 
         try:
-            feed = feedparser.parse(url)
+            response = self._http.get(url, headers=self.HEADERS, timeout=30)
+            response.raise_for_status()
+            feed = feedparser.parse(response.content)
         except Exception as e:
             print(f"Error parsing feed: {e}")
             return items
@@ -8,10 +8,6 @@ import re
 
 import requests
 
-import sys
-from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
-
 from src.config.settings import (
     FMP_API_KEY,
     UNIVERSE_INCLUDE_SP500,
@@ -19,7 +19,9 @@ from youtube_transcript_api.proxies import WebshareProxyConfig
 
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.config.settings import (
     YOUTUBE_API_KEY,
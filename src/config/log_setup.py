@@ -0,0 +1,34 @@
+"""
+Logging setup for Daily Market Digest.
+
+Status lines from the async analyzers go through a QueueHandler, so a
+coroutine only enqueues the record; a background QueueListener thread
+does the terminal writes.
+"""
+import atexit
+import logging
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+_listener = None
+
+
+def setup_logging(level: int = logging.INFO) -> None:
+    """Route the "src" loggers to stdout through a background queue listener."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    queue = SimpleQueue()
+    _listener = QueueListener(queue, stream_handler)
+    _listener.start()
+    atexit.register(_listener.stop)  # Flush pending records on exit
+
+    logger = logging.getLogger("src")
+    logger.addHandler(QueueHandler(queue))
+    logger.setLevel(level)
+    logger.propagate = False
@@ -141,6 +141,29 @@ NEWSAPI_CATEGORIES = ["business", "technology"]
 GEMINI_MODEL = "gemini-2.0-flash"
 GEMINI_TEMPERATURE = 0.3
 GEMINI_MAX_OUTPUT_TOKENS = 16384  # Increased for deeper analysis
+GEMINI_EMBEDDING_MODEL = "text-embedding-004"
+INDUSTRY_RAW_DATA_TOKEN_BUDGET = 4000  # Estimated tokens of raw intel fed to steps 4-5
+# Estimated tokens of the pre-market news list fed to each stage
+PRE_MARKET_HIDDEN_NEWS_TOKENS = 2000
+PRE_MARKET_LAYER_NEWS_TOKENS = 1300
+PRE_MARKET_SUMMARY_NEWS_TOKENS = 1700
+GEMINI_MAX_PARALLEL = 5  # Concurrent async requests per event loop
+GEMINI_MAX_RETRIES = 5  # Attempts for rate-limited / unavailable responses
+GEMINI_RETRY_MAX_WAIT = 30  # Seconds, cap for exponential backoff
+GEMINI_KEEPALIVE_CONNECTIONS = 8  # Idle HTTP connections kept open for reuse
+STOCK_BATCH_SIZE = 8  # Stocks per request in StockAnalyzer.analyze_stocks_batch
+
+# LLM response cache settings
+LLM_CACHE_PATH = DATA_DIR / "llm_cache.sqlite3"
+SEMANTIC_CACHE_THRESHOLD = 0.92  # Cosine similarity required for a cache hit
+SEMANTIC_CACHE_BATCH_THRESHOLD = 0.98  # Whole news batches: a few new headlines must miss
+SEMANTIC_CACHE_TTL_HOURS = 24
+RESPONSE_CACHE_TTL_HOURS = 24  # Exact-prompt cache (same model/prompt/settings)
+VIDEO_CACHE_TTL_HOURS = 24 * 30  # A video's transcript, and so its analysis, does not change
+VIDEO_BATCH_TRANSCRIPT_CHARS = 8000  # Transcript slice per video when videos share one request
+ENABLE_GEMINI_CACHE = os.getenv("ENABLE_GEMINI_CACHE", "true").lower() in ("1", "true", "yes", "y")  # false: always call the model
+ANALYSIS_CACHE_DIR = DATA_DIR / "analysis_cache"  # Finished IndustryAnalyzer results
+ANALYSIS_CACHE_TTL_HOURS = 24  # Reruns on the same intel items (e.g. after a crash) reuse the result
 
 # Report settings
 MAX_NEWS_ITEMS = 30  # Increased for more comprehensive coverage
@@ -14,12 +14,14 @@ Usage:
 """
 
 import argparse
+from collections import Counter
 import sys
 from datetime import datetime
 from pathlib import Path
 
-# Add project root to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import pytz
 
@@ -32,8 +34,10 @@ from src.config.settings import (
     NOTION_DATABASE_ID,
     US_EASTERN_TZ,
 )
+from src.config.log_setup import setup_logging
 from src.collectors import NewsCollector, StockCollector
 from src.analyzers import NewsAnalyzer, StockAnalyzer
+from src.analyzers.gemini_client import run_sync
 from src.outputs import MarkdownReportGenerator, NotionPublisher
 
 
@@ -398,12 +402,16 @@ def generate_post_market_report():
     print("📊 Fetching market data...")
     market_overview = stock_collector.get_market_overview()
 
-    # Generate post-market review (comparing with pre-market predictions)
-    print("🔍 Generating post-market review...")
-    market_review = stock_analyzer.analyze_post_market_review(
-        market_overview,
-        pre_market_content=pre_market_content,
-        news_items=news_items,
+    # Post-market review (comparing with pre-market predictions) and
+    # tomorrow outlook are independent, so request them concurrently
+    print("🔍 Generating post-market review and tomorrow outlook...")
+    market_review, tomorrow_outlook = run_sync(
+        stock_analyzer.analyze_post_market_review_async(
+            market_overview,
+            pre_market_content=pre_market_content,
+            news_items=news_items,
+        ),
+        stock_analyzer.generate_tomorrow_outlook_async(news_items),
     )
 
     # Get watchlist with fundamental focus
@@ -414,10 +422,6 @@ def generate_post_market_report():
         news_items=news_items,
     )
 
-    # Generate tomorrow outlook
-    print("🔮 Generating tomorrow outlook...")
-    tomorrow_outlook = stock_analyzer.generate_tomorrow_outlook(news_items)
-
     # Check for after-hours news (earnings, announcements)
     after_hours_news = ""
     earnings_keywords = ["earnings", "財報", "業績", "after hours", "盤後"]
@@ -743,11 +747,9 @@ def test_components():
         print(f"   ✅ Collected {len(news)} news items")
 
         # Show source breakdown
-        by_source = {}
-        for item in news:
-            by_source[item.source] = by_source.get(item.source, 0) + 1
+        by_source = Counter(item.source for item in news)
         print("   Sources:")
-        for source, count in sorted(by_source.items(), key=lambda x: -x[1]):
+        for source, count in by_source.most_common():
             print(f"      {source}: {count}")
 
         # Show ticker mentions
@@ -815,6 +817,7 @@ def main():
     )
 
     args = parser.parse_args()
+    setup_logging()
 
     # Check API keys for non-test commands
     if args.command != "test" and not check_api_keys():
@@ -7,7 +7,9 @@ from pathlib import Path
 import pytz
 
 import sys
-sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+if __name__ == "__main__":
+    # Running this file directly: make the project root importable
+    sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from src.config.settings import REPORTS_DIR, TIMEZONE
 
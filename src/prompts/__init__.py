@@ -1 +1,11 @@
 """Prompt templates for Daily Market Digest."""
+
+
+def build_prompt(static_prefix: str, variable_part: str) -> str:
+    """
+    Append per-run data after the static instructions.
+
+    Keeping the instruction prefix first and byte-identical lets Gemini's
+    implicit prefix cache reuse it across calls.
+    """
+    return f"{static_prefix}\n---\n\n{variable_part}"
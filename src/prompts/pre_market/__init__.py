@@ -1,18 +1,23 @@
 """Pre-market report prompts."""
-from .hidden_layer import HIDDEN_LAYER_PROMPT
+from .hidden_layer import HIDDEN_LAYER_PROMPT, HIDDEN_LAYER_INPUT
 from .layers import (
     LAYER_0_1_PROMPT,
-    LAYER_2_3_PROMPT,
-    LAYER_4_5_PROMPT,
+    LAYER_0_1_INPUT,
+    LAYER_2_5_PROMPT,
+    LAYER_2_5_INPUT,
     NEWS_SUMMARY_PROMPT,
+    NEWS_SUMMARY_INPUT,
 )
 from .v3 import PRE_MARKET_V3_PROMPT
 
 __all__ = [
     "HIDDEN_LAYER_PROMPT",
+    "HIDDEN_LAYER_INPUT",
     "LAYER_0_1_PROMPT",
-    "LAYER_2_3_PROMPT",
-    "LAYER_4_5_PROMPT",
+    "LAYER_0_1_INPUT",
+    "LAYER_2_5_PROMPT",
+    "LAYER_2_5_INPUT",
     "NEWS_SUMMARY_PROMPT",
+    "NEWS_SUMMARY_INPUT",
     "PRE_MARKET_V3_PROMPT",
 ]
@@ -1,33 +1,19 @@
 """
 Hidden Processing Layer Prompt
 This layer processes raw data internally and does not output to the final report.
+
+The prompt is split into a static instruction prefix (HIDDEN_LAYER_PROMPT)
+and a per-run input template (HIDDEN_LAYER_INPUT) appended after it, so the
+byte-identical prefix can hit Gemini's implicit prompt cache.
 """
 
+# Static instructions: no placeholders, keep byte-identical across runs
 HIDDEN_LAYER_PROMPT = """你是一位頂尖的投資研究分析師。這是 Hidden Processing Layer，用於內部數據處理。
 
 ## 你的任務
 
 對比今日數據與昨日報告，識別「變化」並篩選高信號資訊。
 
-## 輸入數據
-
-### 昨日報告內容
-{yesterday_report}
-
-### 今日新聞
-{news_data}
-
-### 今日 SEC 公告
-{sec_data}
-
-### 今日 FDA 動態
-{fda_data}
-
-### 今日市場數據
-{market_data}
-
----
-
 ## 處理規則
 
 ### 1. 變化識別
@@ -56,40 +42,59 @@ HIDDEN_LAYER_PROMPT = """你是一位頂尖的投資研究分析師。這是 Hid
 ## 輸出格式（JSON）
 
 ```json
-{{
+{
     "macro_changes": [
-        {{
+        {
             "type": "延續|反轉|新發現",
             "summary": "簡短描述",
             "impact": "對市場的具體影響",
             "related_assets": ["資產代碼"]
-        }}
+        }
     ],
     "industry_changes": [
-        {{
+        {
             "type": "延續|反轉|新發現",
             "industry": "行業名稱",
             "summary": "簡短描述",
             "impact": "對行業的具體影響",
             "related_tickers": ["股票代碼"]
-        }}
+        }
     ],
     "company_changes": [
-        {{
+        {
             "type": "延續|反轉|新發現",
             "ticker": "股票代碼",
             "summary": "簡短描述",
             "catalyst": "觸發因素",
             "action_signal": "觀察|買入信號|賣出信號"
-        }}
+        }
     ],
     "filtered_noise": [
         "被過濾的低信號新聞標題..."
     ],
     "yesterday_unavailable": false,
     "yesterday_note": ""
-}}
+}
 ```
 
 如果昨日報告不可用，設置 `yesterday_unavailable: true` 並在 `yesterday_note` 說明，同時所有變化類型標記為「新發現」。
 """
+
+# Per-run data, appended after the instructions
+HIDDEN_LAYER_INPUT = """## 輸入數據
+
+### 昨日報告內容
+{yesterday_report}
+
+### 今日新聞
+{news_data}
+
+### 今日 SEC 公告
+{sec_data}
+
+### 今日 FDA 動態
+{fda_data}
+
+### 今日市場數據
+{market_data}
+"""
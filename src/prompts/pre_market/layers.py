@@ -1,5 +1,9 @@
 """
 Layer 0-5 Prompts for Pre-Market Report
+
+Each prompt is split into a static instruction prefix (*_PROMPT, no
+placeholders) and a per-run input template (*_INPUT) appended after it,
+so the byte-identical prefix can hit Gemini's implicit prompt cache.
 """
 
 # ============================================================================
@@ -8,16 +12,7 @@ Layer 0-5 Prompts for Pre-Market Report
 
 LAYER_0_1_PROMPT = """你是一位頂尖的投資研究分析師，正在生成盤前報告的 Layer 0 和 Layer 1。
 
-## Hidden Layer 處理結果
-{hidden_layer_output}
-
-## 今日市場數據
-{market_data}
-
-## 今日新聞
-{news_data}
-
----
+Hidden Layer 處理結果為緊湊 JSON，鍵為 macro_changes、industry_changes、company_changes、filtered_noise、yesterday_unavailable、yesterday_note。
 
 ## 請生成以下內容：
 
@@ -40,8 +35,6 @@ LAYER_0_1_PROMPT = """你是一位頂尖的投資研究分析師，正在生成
 **5. 風險提醒**
 [當前需要注意的主要風險因素]
 
-{yesterday_warning}
-
 ---
 
 ### Layer 1: What Changed Today（變化識別）
@@ -72,25 +65,30 @@ LAYER_0_1_PROMPT = """你是一位頂尖的投資研究分析師，正在生成
 2. Layer 0 每個區塊限制 1-2 行
 3. Layer 1 每個層面列出 2-4 個最重要的變化
 4. 所有內容必須基於提供的數據，不要編造
+5. 以 JSON 物件輸出，鍵為 layer_0、layer_1；每個值是該 Layer 的完整 Markdown 內容，分別以 `### Layer 0`、`### Layer 1` 標題開頭
 """
 
-# ============================================================================
-# LLM Call 2: Layer 2-3
-# ============================================================================
+LAYER_0_1_INPUT = """## Hidden Layer 處理結果
+{hidden_layer_output}
 
-LAYER_2_3_PROMPT = """你是一位頂尖的投資研究分析師，正在生成盤前報告的 Layer 2 和 Layer 3。
+## 今日市場數據
+{market_data}
 
-## 前序報告內容
-### Layer 0: Executive Snapshot
-{layer_0_content}
+## 今日新聞
+{news_data}
 
-### Layer 1: What Changed Today
-{layer_1_content}
+{yesterday_warning}
+"""
 
-## 市場數據
-{market_data}
+# ============================================================================
+# LLM Call 2: Layer 2-5
+# ============================================================================
 
----
+LAYER_2_5_PROMPT = """你是一位頂尖的投資研究分析師，正在生成盤前報告的 Layer 2 到 Layer 5。
+
+Layer 4-5 必須以你在同一回覆中寫出的 Layer 2-3 為前提。
+
+Hidden Layer 識別的公司變化為緊湊 JSON 陣列，每項含 type、ticker、summary、catalyst、action_signal。
 
 ## 請生成以下內容：
 
@@ -146,42 +144,6 @@ LAYER_2_3_PROMPT = """你是一位頂尖的投資研究分析師，正在生成
 
 ---
 
-## 輸出要求
-1. 語言：繁體中文
-2. Layer 2 嚴格限制最多 3 條推斷
-3. 每條推斷必須通過 Quality Gate
-4. Layer 3 的狀態燈必須與 Layer 2 的推斷一致
-"""
-
-# ============================================================================
-# LLM Call 3: Layer 4-5 + News Summary
-# ============================================================================
-
-LAYER_4_5_PROMPT = """你是一位頂尖的投資研究分析師，正在生成盤前報告的 Layer 4 和 Layer 5。
-
-## 前序報告內容
-### Layer 0: Executive Snapshot
-{layer_0_content}
-
-### Layer 1: What Changed Today
-{layer_1_content}
-
-### Layer 2: Structural Interpretation
-{layer_2_content}
-
-### Layer 3: Asset Allocation Watchlist
-{layer_3_content}
-
-## 觀察名單股票數據
-{watchlist_data}
-
-## Hidden Layer 識別的公司變化
-{company_changes}
-
----
-
-## 請生成以下內容：
-
 ### Layer 4: Equity Signals（個股信號）
 
 #### 4A: 觀察名單觸發
@@ -219,25 +181,38 @@ LAYER_4_5_PROMPT = """你是一位頂尖的投資研究分析師，正在生成
 
 ## 輸出要求
 1. 語言：繁體中文
-2. 4A 只列出有明確信號的標的（不要列出「無觸發」的股票）
-3. 4B 限制 3-5 個最重要的新發現
-4. Layer 5 嚴格限制 3 行
-5. 所有股票代碼使用美股格式（如 AAPL, NVDA）
+2. 以 JSON 物件輸出，鍵為 layer_2、layer_3、layer_4、layer_5；每個值是該 Layer 的完整 Markdown 內容，分別以 `### Layer 2`、`### Layer 3`、`### Layer 4`、`### Layer 5` 標題開頭
+3. Layer 2 嚴格限制最多 3 條推斷
+4. 每條推斷必須通過 Quality Gate
+5. Layer 3 的狀態燈必須與 Layer 2 的推斷一致
+6. 4A 只列出有明確信號的標的（不要列出「無觸發」的股票）
+7. 4B 限制 3-5 個最重要的新發現
+8. Layer 5 嚴格限制 3 行
+9. 所有股票代碼使用美股格式（如 AAPL, NVDA）
 """
 
-# ============================================================================
-# News Summary Prompt
-# ============================================================================
-
-NEWS_SUMMARY_PROMPT = """你是一位財經新聞編輯，正在撰寫今日新聞摘要。
+LAYER_2_5_INPUT = """## 前序報告內容
+### Layer 0: Executive Snapshot
+{layer_0_content}
 
-## 今日新聞
-{news_data}
+### Layer 1: What Changed Today
+{layer_1_content}
 
 ## 市場數據
 {market_data}
 
----
+## 觀察名單股票數據
+{watchlist_data}
+
+## Hidden Layer 識別的公司變化
+{company_changes}
+"""
+
+# ============================================================================
+# News Summary Prompt
+# ============================================================================
+
+NEWS_SUMMARY_PROMPT = """你是一位財經新聞編輯，正在撰寫今日新聞摘要。
 
 ## 請生成段落式新聞摘要
 
@@ -253,3 +228,10 @@ NEWS_SUMMARY_PROMPT = """你是一位財經新聞編輯，正在撰寫今日新
 
 請直接輸出段落內容，不需要標題。
 """
+
+NEWS_SUMMARY_INPUT = """## 今日新聞
+{news_data}
+
+## 市場數據
+{market_data}
+"""
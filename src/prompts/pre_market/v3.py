@@ -7,7 +7,7 @@ PRE_MARKET_V3_PROMPT = """你是一位美股盤前的專業投資研究助理，
 你會收到一份結構化資料包（JSON）。你的任務：
 1) 用最短的文字完成「盤前作戰簡報」。
 2) 所有內容必須嚴格基於資料包，不可自行補充或編造。
-3) 缺資料時請明確寫「無資料」。
+3) 缺資料時請明確寫「無資料」；資料包中未出現的欄位代表當日無該類資料。
 4) 請用繁體中文。
 
 ---
@@ -33,7 +33,7 @@ PRE_MARKET_V3_PROMPT = """你是一位美股盤前的專業投資研究助理，
 - 只能引用資料包內的內容
 - 不要加入免責聲明
 - watchlist_focus 與 event_driven 的 symbol 必須來自候選清單
-- 若候選清單為空，請輸出空陣列
+- 若候選清單為空或未出現在資料包中，請輸出空陣列
 
 只輸出 JSON，不要其他文字。
 """
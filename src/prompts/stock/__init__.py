@@ -0,0 +1,48 @@
+"""Stock analyzer prompts."""
+from .reports import (
+    STOCK_ANALYSIS_PROMPT,
+    STOCK_ANALYSIS_INPUT,
+    STOCK_BATCH_ANALYSIS_PROMPT,
+    STOCK_BATCH_ITEM_INPUT,
+    MARKET_OVERVIEW_PROMPT,
+    MARKET_OVERVIEW_MONDAY_PROMPT,
+    MARKET_OVERVIEW_INPUT,
+    POST_MARKET_REVIEW_PROMPT,
+    POST_MARKET_REVIEW_INPUT,
+    TOMORROW_OUTLOOK_PROMPT,
+    TOMORROW_OUTLOOK_INPUT,
+    INDUSTRY_REPORT_PROMPT,
+    INDUSTRY_REPORT_INPUT,
+    WEEKLY_OUTLOOK_PROMPT,
+    WEEKLY_OUTLOOK_INPUT,
+    GLOBAL_SNAPSHOT_PROMPT,
+    GLOBAL_SNAPSHOT_INPUT,
+    CATEGORIZE_NEWS_PROMPT,
+    CATEGORIZE_NEWS_INPUT,
+    HASHTAGS_PROMPT,
+    HASHTAGS_INPUT,
+)
+
+__all__ = [
+    "STOCK_ANALYSIS_PROMPT",
+    "STOCK_ANALYSIS_INPUT",
+    "STOCK_BATCH_ANALYSIS_PROMPT",
+    "STOCK_BATCH_ITEM_INPUT",
+    "MARKET_OVERVIEW_PROMPT",
+    "MARKET_OVERVIEW_MONDAY_PROMPT",
+    "MARKET_OVERVIEW_INPUT",
+    "POST_MARKET_REVIEW_PROMPT",
+    "POST_MARKET_REVIEW_INPUT",
+    "TOMORROW_OUTLOOK_PROMPT",
+    "TOMORROW_OUTLOOK_INPUT",
+    "INDUSTRY_REPORT_PROMPT",
+    "INDUSTRY_REPORT_INPUT",
+    "WEEKLY_OUTLOOK_PROMPT",
+    "WEEKLY_OUTLOOK_INPUT",
+    "GLOBAL_SNAPSHOT_PROMPT",
+    "GLOBAL_SNAPSHOT_INPUT",
+    "CATEGORIZE_NEWS_PROMPT",
+    "CATEGORIZE_NEWS_INPUT",
+    "HASHTAGS_PROMPT",
+    "HASHTAGS_INPUT",
+]